@@ -0,0 +1,301 @@
+"""
+Backfill AI results for historic calls.
+
+Streams CallLog rows that have a recording_url but no AIResult (keyset
+pagination on id) and runs the AI pipeline on them with bounded
+concurrency and a rate limit shared by every backfill process through
+Redis. Progress is checkpointed to a JSON file, so an interrupted run
+(Ctrl-C, crash, deploy) resumes where it stopped.
+
+Run from the repo root:
+    python -m app.backfill                          # everything outstanding
+    python -m app.backfill --concurrency 8 --rate 4
+    python -m app.backfill --limit 100
+    python -m app.backfill --dry-run                # count only
+    python -m app.backfill --retry-failed           # include calls that failed before
+
+The OpenAI SDK reads OPENAI_BASE_URL, so a run can be pointed at a stub
+server with stub recording URLs (see benchmarks/stub_ai_server.py).
+"""
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Set, Tuple
+
+from sqlmodel import Session, select, func
+
+from app.config import settings
+from app.models.ai_result import AIResult
+from app.models.call_log import CallLog
+from app.models.db import engine, init_db
+from app.services.ai_pipeline import process_call
+from app.services.rate_limiter import CallRateLimiter
+from app.tasks.ai_tasks import claim_job_lock, get_ai_result, release_job_lock
+
+
+def unprocessed_calls() -> tuple:
+    """
+    WHERE clauses for calls with a recording and no AIResult yet.
+    """
+    has_result = select(AIResult.id).where(AIResult.call_id == CallLog.id).exists()
+    return CallLog.recording_url.is_not(None), CallLog.recording_url != "", ~has_result
+
+
+def count_unprocessed(after_id: int) -> int:
+    with Session(engine) as session:
+        return session.exec(
+            select(func.count()).select_from(CallLog).where(*unprocessed_calls(), CallLog.id > after_id)
+        ).one()
+
+
+def stream_unprocessed(after_id: int, page_size: int) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (call_id, recording_url) in id order, one keyset page per query.
+    """
+    last_id = after_id
+    while True:
+        with Session(engine) as session:
+            rows = session.exec(
+                select(CallLog.id, CallLog.recording_url)
+                .where(*unprocessed_calls(), CallLog.id > last_id)
+                .order_by(CallLog.id)
+                .limit(page_size)
+            ).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+
+def failed_calls(call_ids: Iterable[int], before_id: int) -> list:
+    """
+    (call_id, recording_url) for previously failed calls up to `before_id`
+    that still have no AIResult. Later ones are streamed again anyway.
+    """
+    call_ids = sorted(i for i in call_ids if i <= before_id)
+    if not call_ids:
+        return []
+    with Session(engine) as session:
+        return session.exec(
+            select(CallLog.id, CallLog.recording_url)
+            .where(*unprocessed_calls(), CallLog.id.in_(call_ids))
+            .order_by(CallLog.id)
+        ).all()
+
+
+class BackfillCheckpoint:
+    """
+    Resume point for a backfill run, saved as JSON.
+    `last_id` only moves past a call once every call before it has finished,
+    so calls that were in flight when the run stopped are picked up again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.resume_from = 0
+        self.failed: Set[int] = set()
+        self._in_flight: Set[int] = set()
+        self._dispatched = 0
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.resume_from = state.get("last_id", 0)
+            self.failed = set(state.get("failed", []))
+        self._dispatched = self.resume_from
+
+    def started(self, call_id: int):
+        with self._lock:
+            self._in_flight.add(call_id)
+            self._dispatched = max(self._dispatched, call_id)
+
+    def finished(self, call_id: int, ok: bool):
+        with self._lock:
+            self._in_flight.discard(call_id)
+            if ok:
+                self.failed.discard(call_id)
+            else:
+                self.failed.add(call_id)
+
+    @property
+    def last_id(self) -> int:
+        with self._lock:
+            # Retried failures sit below resume_from and don't hold the mark back
+            pending = [i for i in self._in_flight if i > self.resume_from]
+            return min(pending) - 1 if pending else self._dispatched
+
+    def save(self):
+        state = {"last_id": self.last_id, "failed": sorted(self.failed)}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+
+class BackfillRunner:
+    """
+    Runs `process(audio_url=..., call_id=...)` (the AI pipeline by default)
+    over a stream of calls. Pass a different `process` to run without
+    OpenAI or recording downloads.
+    """
+
+    def __init__(
+        self,
+        checkpoint: BackfillCheckpoint,
+        concurrency: int,
+        rate: float,
+        burst: int,
+        process: Callable[..., dict] = process_call,
+        report_every: float = 10.0,
+    ):
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.process = process
+        self.report_every = report_every
+        # One bucket in Redis for every backfill process
+        self.limiter = CallRateLimiter({"backfill": (rate, burst)})
+        self.stop = threading.Event()
+        self.counts = {"done": 0, "failed": 0, "skipped": 0}
+        self._counts_lock = threading.Lock()
+        self.total = 0
+        self.started_at = time.monotonic()
+
+    def _process_one(self, call_id: int, audio_url: str) -> Optional[str]:
+        """
+        Returns "done", "failed" or "skipped"; None if stopped before starting.
+        """
+        if self.stop.is_set():
+            return None
+        # Another worker (/process-ai or a second backfill) has this call
+        if not claim_job_lock(call_id):
+            return "skipped"
+        try:
+            if get_ai_result(call_id):
+                return "skipped"
+            wait = self.limiter.reserve("backfill", "openai")
+            if wait > 0 and self.stop.wait(wait):
+                return None
+            result = self.process(audio_url=audio_url, call_id=call_id)
+            if "error" in result:
+                print(f"[❌] Backfill failed for call {call_id}: {result['error']}")
+                return "failed"
+            return "done"
+        except Exception as e:
+            print(f"[❌] Backfill failed for call {call_id}: {e}")
+            return "failed"
+        finally:
+            release_job_lock(call_id)
+
+    def _finish(self, call_id: int, future):
+        outcome = future.result()
+        if outcome is None:
+            return  # Not run; stays behind the checkpoint mark
+        self.checkpoint.finished(call_id, outcome != "failed")
+        with self._counts_lock:
+            self.counts[outcome] += 1
+
+    def progress(self) -> str:
+        with self._counts_lock:
+            finished = sum(self.counts.values())
+            counts = dict(self.counts)
+        elapsed = time.monotonic() - self.started_at
+        rate = finished / elapsed if elapsed else 0.0
+        remaining = max(0, self.total - finished)
+        eta = f"{remaining / rate / 60:.1f}m" if rate else "?"
+        return (
+            f"{finished}/{self.total} calls ({counts['done']} done, {counts['failed']} failed, "
+            f"{counts['skipped']} skipped) {rate:.2f} calls/s ETA {eta}"
+        )
+
+    def _report(self, finished: threading.Event):
+        while not finished.wait(self.report_every):
+            self.checkpoint.save()
+            print(f"[📈] {self.progress()}")
+
+    def run(self, calls: Iterable[Tuple[int, str]], total: int, limit: Optional[int] = None) -> dict:
+        self.total = min(total, limit) if limit else total
+        self.started_at = time.monotonic()
+        finished = threading.Event()
+        reporter = threading.Thread(target=self._report, args=(finished,), daemon=True)
+        reporter.start()
+
+        # Keep a bounded number of calls queued so the stream is read lazily
+        slots = threading.BoundedSemaphore(self.concurrency * 2)
+        dispatched = 0
+        try:
+            with ThreadPoolExecutor(self.concurrency, thread_name_prefix="backfill") as pool:
+                for call_id, audio_url in calls:
+                    if limit and dispatched >= limit:
+                        break
+                    while not slots.acquire(timeout=0.5):
+                        if self.stop.is_set():
+                            break
+                    if self.stop.is_set():
+                        break
+
+                    self.checkpoint.started(call_id)
+                    future = pool.submit(self._process_one, call_id, audio_url)
+                    future.add_done_callback(
+                        lambda f, call_id=call_id: (self._finish(call_id, f), slots.release())
+                    )
+                    dispatched += 1
+        finally:
+            finished.set()
+            reporter.join()
+            self.checkpoint.save()
+
+        print(f"[✅] Backfill {'stopped' if self.stop.is_set() else 'finished'}: {self.progress()}")
+        return dict(self.counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AI pipeline for calls that have no AI result yet.")
+    parser.add_argument("--concurrency", type=int, default=settings.BACKFILL_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=settings.BACKFILL_RATE, help="Calls started per second")
+    parser.add_argument("--burst", type=int, default=settings.BACKFILL_BURST)
+    parser.add_argument("--page-size", type=int, default=settings.BACKFILL_PAGE_SIZE)
+    parser.add_argument("--checkpoint", default=settings.BACKFILL_CHECKPOINT_PATH)
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many calls")
+    parser.add_argument("--retry-failed", action="store_true", help="Also retry calls that failed before")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first call")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the calls to process")
+    args = parser.parse_args()
+
+    init_db()
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    checkpoint = BackfillCheckpoint(args.checkpoint)
+
+    retry = failed_calls(checkpoint.failed, checkpoint.resume_from) if args.retry_failed else []
+    total = count_unprocessed(checkpoint.resume_from) + len(retry)
+    print(f"[🗂️] {total} call(s) to backfill, resuming after call {checkpoint.resume_from}")
+    if args.dry_run or not total:
+        return
+
+    runner = BackfillRunner(checkpoint, args.concurrency, args.rate, args.burst)
+
+    def interrupt(signum, frame):
+        print("[⏸️] Stopping after in-flight calls finish (Ctrl-C again to abort)...")
+        runner.stop.set()
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    signal.signal(signal.SIGINT, interrupt)
+    signal.signal(signal.SIGTERM, interrupt)
+
+    def calls():
+        yield from retry
+        yield from stream_unprocessed(checkpoint.resume_from, args.page_size)
+
+    runner.run(calls(), total, args.limit)
+
+
+if __name__ == "__main__":
+    main()
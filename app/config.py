@@ -8,10 +8,87 @@ class Settings(BaseSettings):
     TWILIO_AUTH_TOKEN: str
     TWILIO_PHONE_NUMBER: str
     TWILIO_CALLBACK_URL: str
+    TWILIO_API_BASE_URL: str = "https://api.twilio.com"  # Point at a fake server for tests
+    TWILIO_HTTP_MAX_CONNECTIONS: int = 20  # Pooled keep-alive connections per process
+    TWILIO_HTTP_TIMEOUT: float = 10.0  # Seconds
+    TWILIO_CPS: float = 1.0  # Calls per second allowed per from-number
+    TWILIO_CPS_BURST: int = 1
+    OUTBOUND_MESSAGE_TTL: int = 3600  # Seconds an undelivered call message is kept
+    OUTBOUND_MESSAGE_MAX: int = 10000  # In-memory fallback size cap
+    TWILIO_STATUS_CALLBACK_URL: str = "https://ai-calling.duckdns.org/v1/calls/status"
+
+    # ---------------------------
+    # Status Callback Ingestion
+    # ---------------------------
+    STATUS_BATCH_SIZE: int = 500  # Events per batched UPDATE
+    STATUS_FLUSH_INTERVAL: float = 1.0  # Seconds between queue drains
+    STATUS_EVENT_MAX_RETRIES: int = 10  # Drains to wait for a call's CallLog row
     # ---------------------------
     # AI Services
     # ---------------------------
     OPENAI_API_KEY: str
+    AI_ANALYSIS_MODE: str = "concurrent"  # concurrent | combined | sequential
+    TRANSCRIBE_CHUNK_MIN_SECONDS: float = 120.0  # Shorter recordings go to Whisper in one request
+    TRANSCRIBE_SEGMENT_SECONDS: float = 60.0  # Target segment length
+    TRANSCRIBE_SILENCE_SEARCH_SECONDS: float = 5.0  # How far from the target to look for silence
+    TRANSCRIBE_OVERLAP_SECONDS: float = 1.5  # Audio shared with each neighbouring segment
+    TRANSCRIBE_CONCURRENCY: int = 4  # Segment requests in flight per recording
+    AI_JOB_LOCK_TTL: int = 3600  # Seconds a queued /process-ai job blocks resubmits
+    AI_CACHE_BACKEND: str = "disk"  # disk | redis | none
+    AI_CACHE_DIR: str = ".cache/ai"
+    AI_CACHE_SIZE_LIMIT: int = 1024 ** 3  # Bytes (disk backend)
+    AI_CACHE_TTL: int = 30 * 24 * 3600  # Seconds
+    SENTIMENT_BACKEND: str = "gpt"  # gpt | local
+    SENTIMENT_MIN_CONFIDENCE: float = 0.6  # Below this, local results fall back to GPT
+    LOCAL_SENTIMENT_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    LOCAL_SENTIMENT_ENCODER_BACKEND: str = "torch"  # torch | onnx (needs optimum[onnxruntime])
+    LOCAL_SENTIMENT_HEAD_PATH: str = "models/sentiment_head.joblib"
+    LOCAL_SENTIMENT_BATCH_SIZE: int = 32
+    LOCAL_SENTIMENT_BATCH_WAIT: float = 0.05  # Seconds to collect concurrent transcripts into one batch
+    PROMPT_TOKEN_BUDGETS: str = "gpt-3.5-turbo=12000,gpt-4o=4000"  # Max prompt tokens per model
+    PROMPT_DEFAULT_BUDGET: int = 8000  # For models not listed above
+    PROMPT_RESERVED_OUTPUT_TOKENS: int = 1024  # Kept free for the reply when no max_tokens is set
+    PROMPT_OVERFLOW_STRATEGY: str = "mapreduce"  # mapreduce | truncate (long transcripts)
+    PROMPT_CHUNK_TOKENS: int = 3000  # Transcript tokens per map step
+    PROMPT_MAP_CONCURRENCY: int = 4  # Chunk requests in flight per transcript
+    RESPONSE_FRAGMENT_MIN_CHARS: int = 20  # Shorter sentences are joined to the next before TTS
+    RESPONSE_FRAGMENT_MAX_CHARS: int = 150  # Longer runs are cut at a comma/space
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000  # Cached replies per campaign prompt (0 disables)
+    RESPONSE_CACHE_TTL: int = 24 * 3600  # Seconds
+    RESPONSE_CACHE_MAX_WORDS: int = 20  # Only turns this short are cached
+    RESPONSE_CACHE_EMBEDDINGS: str = "none"  # none | local | openai (similarity tier)
+    RESPONSE_CACHE_SIMILARITY: float = 0.92  # Cosine similarity for a similarity hit
+
+    # ---------------------------
+    # Live Transcription
+    # ---------------------------
+    LIVE_STT_BACKEND: str = "whisper"  # whisper | fake
+    FAKE_STT_LATENCY: float = 0.05  # Seconds per fake transcription
+    LIVE_BUFFER_SECONDS: float = 60.0  # Audio kept per stream in the ring buffer
+    LIVE_VAD_THRESHOLD: float = 500.0  # RMS level counted as speech
+    LIVE_VAD_MIN_SPEECH: float = 0.1  # Seconds of speech to open an utterance
+    LIVE_VAD_MIN_SILENCE: float = 0.6  # Seconds of silence to close one
+    LIVE_VAD_PREROLL: float = 0.2  # Seconds kept before speech start / after speech end
+    LIVE_PARTIAL_INTERVAL: float = 1.0  # Seconds of new audio between partials (0 disables)
+    LIVE_MAX_UTTERANCE_SECONDS: float = 15.0  # Force a final on long monologues
+
+    # ---------------------------
+    # Recording Downloads
+    # ---------------------------
+    AUDIO_HTTP_POOL_SIZE: int = 20  # Pooled connections for recording downloads
+    AUDIO_DOWNLOAD_CHUNK_SIZE: int = 64 * 1024  # Bytes per streamed chunk
+    AUDIO_SPOOL_MAX_BYTES: int = 2 * 1024 * 1024  # Held in memory before spilling to disk
+    AUDIO_DOWNLOAD_RETRIES: int = 3
+    AUDIO_DOWNLOAD_TIMEOUT: float = 30.0  # Seconds
+
+    # ---------------------------
+    # AI Backfill (python -m app.backfill)
+    # ---------------------------
+    BACKFILL_CONCURRENCY: int = 4  # Calls processed at once per backfill process
+    BACKFILL_RATE: float = 2.0  # Calls started per second across all backfill processes
+    BACKFILL_BURST: int = 4
+    BACKFILL_PAGE_SIZE: int = 200  # Rows per keyset page
+    BACKFILL_CHECKPOINT_PATH: str = ".cache/backfill_checkpoint.json"
 
     # ---------------------------
     # JWT Secret
@@ -22,6 +99,43 @@ class Settings(BaseSettings):
     # Redis Settings (for Celery)
     # ---------------------------
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_ENABLED: bool = True  # Set False to use in-process fallbacks (tests/local)
+
+    # ---------------------------
+    # Dialing Settings
+    # ---------------------------
+    DIAL_CONCURRENCY: int = 10  # Max in-flight calls per campaign shard
+    CAMPAIGN_SHARD_SIZE: int = 1000  # Contacts per Celery shard task
+    CHECKPOINT_BATCH_SIZE: int = 50  # Dialed contacts per checkpoint write
+    JOB_PROGRESS_EVERY: int = 25  # Outcomes between /start job progress updates
+    CAMPAIGN_RUN_LOCK_TTL: int = 600  # Seconds; refreshed while shards are dialing
+    CAMPAIGN_RUN_LOCK_RETRY: int = 10  # Seconds before a blocked run_campaign retries
+    CAMPAIGN_SIGNAL_RECHECK: float = 5.0  # Seconds between database status re-reads while dialing
+
+    # ---------------------------
+    # Call Log Writer
+    # ---------------------------
+    CALL_LOG_BATCH_SIZE: int = 100  # Rows per bulk insert
+    CALL_LOG_FLUSH_INTERVAL: float = 2.0  # Max seconds a row waits in the buffer
+    CALL_LOG_SYNC_WRITES: bool = False  # Write each row immediately (tests)
+    CALL_LOG_MAX_RETRIES: int = 5  # Consecutive failed flushes before rows are spilled
+    CALL_LOG_MAX_BUFFERED: int = 10000  # Rows kept for retry; older ones are spilled
+    CALL_LOG_SPILL_PATH: str = ".cache/call_log_spill.jsonl"  # Empty to drop instead
+
+    # ---------------------------
+    # Provider Routing
+    # ---------------------------
+    CALL_PROVIDERS: str = "twilio"  # Comma-separated: twilio, callhippo, fake
+    CALLHIPPO_API_URL: str = ""
+    CALLHIPPO_API_KEY: str = ""
+    CALLHIPPO_FROM_NUMBER: str = ""
+    CALLHIPPO_CPS: float = 1.0
+    CALLHIPPO_CPS_BURST: int = 1
+    FAKE_PROVIDER_LATENCY: float = 0.05  # Seconds per fake call
+    FAKE_PROVIDER_FAILURE_RATE: float = 0.0
+    PROVIDER_HEALTH_WINDOW: int = 50  # Recent calls used for latency/error stats
+    PROVIDER_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open the circuit
+    PROVIDER_RESET_SECONDS: float = 30.0  # Open circuit cool-down before a trial call
 
     class Config:
         env_file = ".env"
@@ -5,6 +5,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from app import jwt_auth
 from app.routes import contacts, campaigns, calls, call_history
 from app.models.db import init_db
+from app.services.call_log_writer import call_log_writer
+from app.services.twilio_transport import twilio_transport
+from app.services.status_events import status_event_consumer
 from app.routes import contact_crud
 from app.routes import campaign_crud
 from app.routes import calls
@@ -21,8 +24,16 @@ app = FastAPI(
 
 # ✅ Event hook to initialize DB
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     init_db()
+    status_event_consumer.start()
+
+# ✅ Write out buffered call logs and close pooled connections on shutdown
+@app.on_event("shutdown")
+async def on_shutdown():
+    await status_event_consumer.stop()
+    call_log_writer.close()
+    await twilio_transport.aclose()
 
 # ✅ Enable CORS for frontend/local testing
 app.add_middleware(
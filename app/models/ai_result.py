@@ -5,7 +5,7 @@ from datetime import datetime
 
 class AIResult(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    call_id: int  # Foreign key ref to CallLog.id
+    call_id: int = Field(index=True)  # Foreign key ref to CallLog.id
     transcript: str
     summary: str
     sentiment: str  # e.g., "Positive", "Negative", "Neutral"
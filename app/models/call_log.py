@@ -18,7 +18,9 @@ class CallLog(SQLModel, table=True):
     region: str
     provider: str
     status: CallStatus = Field(default=CallStatus.initiated)
+    call_sid: Optional[str] = Field(default=None, index=True)  # Provider call ID
     recording_url: Optional[str] = None
-    duration: Optional[int] = None  # in seconds, future use
+    attempt: int = Field(default=1)  # 1 = first dial, >1 = retry
+    duration: Optional[int] = None  # in seconds, from status callbacks
     ai_summary: Optional[str] = None  # Future AI call summary
     timestamp: datetime = Field(default_factory=datetime.utcnow)
@@ -18,4 +18,7 @@ class Campaign(SQLModel, table=True):
     message: str
     region: str
     status: CampaignStatus = Field(default=CampaignStatus.scheduled)
+    max_retries: int = Field(default=3)  # Total dial attempts per contact
+    retry_backoff: float = Field(default=3.0)  # Seconds before first retry, doubles each retry
+    retry_backoff_max: float = Field(default=300.0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
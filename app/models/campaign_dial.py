@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint
+from typing import Optional
+from datetime import datetime
+
+
+class CampaignDial(SQLModel, table=True):
+    """
+    One row per contact a campaign has finished dialing.
+    Used to resume paused or crashed campaigns without redialing anyone.
+    """
+    __table_args__ = (UniqueConstraint("campaign_id", "contact_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    campaign_id: int
+    contact_id: int
+    status: str  # Final CallStatus for this contact
+    dialed_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,4 +1,5 @@
 import os
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel, create_engine, Session
 
 from app.config import settings
@@ -6,6 +7,7 @@ from app.models.call_log import CallLog
 from app.models.contact import Contact
 from app.models.campaign import Campaign
 from app.models.ai_result import AIResult  # ✅ Add this
+from app.models.campaign_dial import CampaignDial
 
 # ✅ Prefer DB_URL from .env if provided
 if hasattr(settings, "DB_URL") and settings.DB_URL:
@@ -20,6 +22,28 @@ engine = create_engine(DATABASE_URL, echo=False)
 # ✅ Create all tables
 def init_db():
     SQLModel.metadata.create_all(engine)
+    add_missing_columns()
+
+# ✅ create_all() doesn't alter existing tables; add new columns/indexes in place
+def add_missing_columns():
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                default = column.default.arg if column.default is not None and column.default.is_scalar else None
+                if isinstance(default, (int, float)) and not isinstance(default, bool):
+                    ddl += f" DEFAULT {default}"
+                conn.execute(text(ddl))
+                print(f"[🛠️] Added column {table.name}.{column.name}")
+
+            indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
 
 # ✅ Session dependency
 def get_session():
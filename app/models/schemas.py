@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from typing import List, Optional
 from enum import Enum
 
@@ -29,13 +29,24 @@ class CampaignRequest(BaseModel):
     region: Optional[str] = "global"  # ✅ NEW: Enables Twilio vs CallHippo selection
     contact_list: List[ContactUpload]
 
-class CampaignCreateRequest(BaseModel):
+class CampaignRetrySettings(BaseModel):
+    max_retries: int = Field(3, ge=1)  # Total dial attempts per contact
+    retry_backoff: float = Field(3.0, ge=0)  # Seconds before first retry
+    retry_backoff_max: float = Field(300.0, ge=0)
+
+    @model_validator(mode="after")
+    def check_backoff_max(self):
+        if self.retry_backoff_max < self.retry_backoff:
+            raise ValueError("retry_backoff_max must be at least retry_backoff")
+        return self
+
+class CampaignCreateRequest(CampaignRetrySettings):
     name: str
     message: str
     region: str
     status: Optional[str] = "scheduled"
 
-class CampaignScheduleRequest(BaseModel):
+class CampaignScheduleRequest(CampaignRetrySettings):
     name: str
     message: str
     region: str
@@ -46,13 +57,18 @@ class CampaignScheduleRequest(BaseModel):
 
 class CallWebhookRequest(BaseModel):
     call_sid: str
-    from_number: str
-    to_number: str
-    status: Optional[str]
+    from_number: str = ""
+    to_number: str = ""
+    status: Optional[str] = None
     recording_url: Optional[str] = None
+    duration: Optional[int] = None
 
 
 # ----------- RESPONSES -----------
 
 class SuccessResponse(BaseModel):
     message: str
+
+class CampaignJobResponse(BaseModel):
+    message: str
+    job_id: str
@@ -7,6 +7,13 @@ from app.models.call_log import CallLog
 from app.models.ai_result import AIResult
 from app.models.campaign import Campaign
 from app.models.contact import Contact
+from app.services.rate_limiter import call_rate_limiter
+from app.services.provider_router import provider_router
+from app.services.ai_cache import ai_cache
+from app.services.live_transcription import live_transcription_stats
+from app.services.gpt import response_stream_stats
+from app.services.response_cache import response_cache
+from app.services.prompt_budget import token_usage
 
 router = APIRouter()
 
@@ -45,11 +52,69 @@ def campaign_statistics():
         campaign_data = {}
         for log in logs:
             campaign = log.campaign_name or "Unassigned"
-            campaign_data.setdefault(campaign, {"total": 0, "success": 0, "failed": 0})
+            campaign_data.setdefault(campaign, {
+                "total": 0, "success": 0, "failed": 0,
+                "first_attempt_success": 0, "retry_success": 0, "retries": 0,
+            })
             campaign_data[campaign]["total"] += 1
+            if (log.attempt or 1) > 1:
+                campaign_data[campaign]["retries"] += 1
             if log.status == "completed":
                 campaign_data[campaign]["success"] += 1
+                if (log.attempt or 1) > 1:
+                    campaign_data[campaign]["retry_success"] += 1
+                else:
+                    campaign_data[campaign]["first_attempt_success"] += 1
             else:
                 campaign_data[campaign]["failed"] += 1
 
         return campaign_data
+
+@router.get("/rate-limits")
+def rate_limit_stats():
+    """
+    Calls-per-second limiter wait stats for this process.
+    """
+    return call_rate_limiter.stats()
+
+@router.get("/providers")
+def provider_routing_stats():
+    """
+    Provider health and routing decisions for this process.
+    """
+    return provider_router.metrics()
+
+@router.get("/ai-cache")
+def ai_cache_stats():
+    """
+    Transcript/analysis cache hit rates for this process.
+    """
+    return ai_cache.stats()
+
+@router.get("/live-transcription")
+def live_transcription_latency():
+    """
+    Per-utterance live transcription latency for this process.
+    """
+    return live_transcription_stats.stats()
+
+@router.get("/voice-responses")
+def voice_response_latency():
+    """
+    Streaming agent reply latency (time to first fragment) for this process.
+    """
+    return response_stream_stats.stats()
+
+@router.get("/response-cache")
+def response_cache_stats():
+    """
+    Agent reply cache hit rates and latency saved, per campaign, for this process.
+    """
+    return response_cache.stats()
+
+@router.get("/tokens")
+def token_usage_stats():
+    """
+    Prompt/completion tokens per request type and how often prompts were fitted.
+    """
+    return token_usage.stats()
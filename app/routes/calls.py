@@ -1,15 +1,22 @@
 from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect, HTTPException, Query
 from fastapi.responses import Response
-from xml.etree.ElementTree import Element, tostring
 from pydantic import BaseModel
-from app.services.ai_pipeline import process_call
+from app.tasks.ai_tasks import enqueue_process_call, get_ai_result, job_id_for
+from app.worker import celery_app
+from app.services.message_store import outbound_message_store
+from app.services import twiml
+from app.services.status_events import status_event_queue
+from app.services.live_transcription import LiveTranscriber
+from app.services.speech_to_text import stt_backend
+from app.models.schemas import CallWebhookRequest
+import json
 import uuid
 
 # ✅ Single router instance
 router = APIRouter()
 
-# ✅ Store outbound messages temporarily (use Redis in production)
-pending_outbound_messages = {}
+# ✅ Outbound messages awaiting Twilio's callback (Redis-backed, TTL-evicted)
+pending_outbound_messages = outbound_message_store
 
 # -----------------------------------
 # POST /v1/calls/inbound — Twilio Webhook
@@ -26,14 +33,8 @@ async def handle_inbound_call(request: Request):
 
     print(f"[Twilio Inbound] From: {from_number}, To: {to_number}")
 
-    # ✅ Basic TwiML response (Future: AI-driven response)
-    response = Element("Response")
-    say = Element("Say", voice="alice")
-    say.text = "Thank you for calling AI Calling Agent. Please wait while we connect you."
-    response.append(say)
-
-    xml_string = tostring(response, encoding='unicode')
-    return Response(content=xml_string, media_type="application/xml")
+    # ✅ Basic TwiML response, pre-rendered (Future: AI-driven response)
+    return Response(content=twiml.INBOUND_GREETING, media_type="application/xml")
 
 
 # -----------------------------------
@@ -58,21 +59,39 @@ async def handle_outbound_call(request: Request, message_id: str = Query(None)):
     
     print(f"[Twilio Outbound Callback] CallSid: {call_sid}, MessageID: {message_id}")
     
-    # Retrieve the custom message
-    message = pending_outbound_messages.get(message_id, "Hello! This is an automated call from our system.")
-    
-    # Clean up after retrieval
-    if message_id in pending_outbound_messages:
-        del pending_outbound_messages[message_id]
+    # Retrieve the custom message (removed from the store as it's read)
+    message = await pending_outbound_messages.pop_async(message_id) if message_id else None
+    if message is None:
+        message = "Hello! This is an automated call from our system."
     
     # Create TwiML response
-    response = Element("Response")
-    say = Element("Say", voice="alice")
-    say.text = message
-    response.append(say)
-    
-    xml_string = tostring(response, encoding='unicode')
-    return Response(content=xml_string, media_type="application/xml")
+    return Response(content=twiml.say_response(message), media_type="application/xml")
+
+
+# -----------------------------------
+# POST /v1/calls/status — Twilio Status Callback
+# -----------------------------------
+@router.post("/status", status_code=204)
+async def handle_status_callback(request: Request):
+    """
+    Receives Twilio call/recording status callbacks.
+    Acknowledges immediately; events are applied to CallLog in batches.
+    """
+    form = await request.form()
+    if not form.get("CallSid"):
+        raise HTTPException(status_code=400, detail="CallSid is required.")
+
+    duration = form.get("CallDuration") or form.get("RecordingDuration")
+    event = CallWebhookRequest(
+        call_sid=form.get("CallSid"),
+        from_number=form.get("From", ""),
+        to_number=form.get("To", ""),
+        status=form.get("CallStatus"),
+        recording_url=form.get("RecordingUrl"),
+        duration=int(duration) if duration and duration.isdigit() else None,
+    )
+    await status_event_queue.push_async(event.model_dump())
+    return Response(status_code=204)
 
 
 # -----------------------------------
@@ -81,18 +100,37 @@ async def handle_outbound_call(request: Request, message_id: str = Query(None)):
 @router.websocket("/v1/calls/live-transcription")
 async def live_transcription_socket(websocket: WebSocket):
     """
-    Handles live transcription (MVP placeholder).
-    Future: integrate Whisper STT streaming.
+    Streams transcripts for Twilio Media Streams audio.
+    Accepts connected/start/media/stop messages with base64 μ-law payloads
+    and sends back `partial` and `final` transcript events per utterance.
     """
     await websocket.accept()
+    transcriber = LiveTranscriber(stt_backend, websocket.send_json)
     try:
         while True:
-            data = await websocket.receive_text()
-            # Simulate transcription response
-            fake_response = f"Transcription: {data}"
-            await websocket.send_text(fake_response)
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+
+            event = message.get("event")
+            if event == "start":
+                transcriber.start(message.get("start") or {})
+            elif event == "media":
+                media = message.get("media") or {}
+                # Only the caller's side when both tracks are streamed
+                if media.get("payload") and media.get("track", "inbound") == "inbound":
+                    transcriber.feed(media["payload"])
+            elif event == "stop":
+                await transcriber.close()
+                break
     except WebSocketDisconnect:
         print("[WebSocket] Client disconnected")
+    finally:
+        # Don't leave STT tasks running whatever ended the stream
+        transcriber.cancel()
 
 
 # -----------------------------------
@@ -102,23 +140,58 @@ class AICallRequest(BaseModel):
     call_id: int
     audio_url: str
 
-@router.post("/process-ai")
+@router.post("/process-ai", status_code=202)
 def process_ai_result(payload: AICallRequest):
     """
-    Trigger AI pipeline (transcription, summarization, sentiment) for a completed call.
+    Queue the AI pipeline (transcription, summarization, sentiment) for a completed call.
+    Re-submitting a call that is queued, running or done doesn't start a new job.
     """
     if not payload.call_id or not payload.audio_url:
         raise HTTPException(status_code=400, detail="call_id and audio_url are required.")
 
-    result = process_call(audio_url=payload.audio_url, call_id=payload.call_id)
-
-    if "error" in result:
-        raise HTTPException(status_code=500, detail=result["error"])
+    if get_ai_result(payload.call_id):
+        return {
+            "status": "processed",
+            "call_id": payload.call_id,
+            "job_id": job_id_for(payload.call_id)
+        }
 
+    try:
+        job_id, queued = enqueue_process_call(payload.call_id, payload.audio_url)
+    except Exception as e:
+        print(f"[❌] Failed to queue AI job for call {payload.call_id}: {e}")
+        raise HTTPException(status_code=503, detail="AI job queue unavailable, try again later.")
     return {
-        "status": "processed",
+        "status": "queued" if queued else "in_progress",
         "call_id": payload.call_id,
-        "ai_result": result
+        "job_id": job_id
     }
+
+
+# -----------------------------------
+# GET /v1/calls/process-ai/{call_id} — AI Job Status/Result
+# -----------------------------------
+@router.get("/process-ai/{call_id}")
+def get_ai_job(call_id: int):
+    """
+    Status of a call's AI job, with the result once processed.
+    """
+    existing = get_ai_result(call_id)
+    if existing:
+        return {
+            "status": "processed",
+            "call_id": call_id,
+            "ai_result": {
+                "transcript": existing.transcript,
+                "summary": existing.summary,
+                "sentiment": existing.sentiment
+            }
+        }
+
+    job = celery_app.AsyncResult(job_id_for(call_id))
+    response = {"status": job.state.lower(), "call_id": call_id, "job_id": job.id}
+    if job.state == "FAILURE":
+        response["error"] = str(job.result)
+    return response
 # Export for use in other modules
 __all__ = ['router', 'pending_outbound_messages']
\ No newline at end of file
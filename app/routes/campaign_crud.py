@@ -32,6 +32,9 @@ def create_campaign(campaign_request: CampaignCreateRequest, session: Session =
             message=campaign_request.message,
             region=campaign_request.region,
             status=status,
+            max_retries=campaign_request.max_retries,
+            retry_backoff=campaign_request.retry_backoff,
+            retry_backoff_max=campaign_request.retry_backoff_max,
             created_at=datetime.utcnow()
         )
         
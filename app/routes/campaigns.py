@@ -5,13 +5,15 @@ from datetime import datetime
 import logging
 
 from app.jwt_auth import get_current_user
-from app.models.schemas import CampaignRequest, SuccessResponse, CampaignScheduleRequest
+from app.models.schemas import CampaignRequest, CampaignJobResponse, CampaignScheduleRequest
 from app.routes.contacts import contact_store
-from app.services.dialer import make_outbound_call
 
 from app.models.db import get_session
 from app.models.campaign import Campaign, CampaignStatus
-from app.tasks.campaign_tasks import run_campaign
+from app.tasks.campaign_tasks import run_campaign, dial_contact_list
+from app.worker import celery_app
+from celery.result import AsyncResult
+from app.services.campaign_signals import campaign_signals
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +28,8 @@ import traceback
 
 router = APIRouter()
 
-@router.post("/start", response_model=SuccessResponse)
-async def start_campaign(
+@router.post("/start", response_model=CampaignJobResponse)
+def start_campaign(
     campaign: CampaignRequest,
     user: dict = Depends(get_current_user)
 ):
@@ -35,37 +37,51 @@ async def start_campaign(
         print("❌ [DEBUG] contact_list is missing or empty!")
         raise HTTPException(status_code=400, detail="No contacts uploaded.")
 
-    successful_calls = 0
-    failed_calls = 0
-
-    print(f"☎️ [DEBUG] Starting calls for {len(campaign.contact_list)} contacts...")
-
-    # Iterate through campaign.contact_list instead of contact_store
-    for contact in campaign.contact_list:
-        print(f"📞 [DEBUG] Processing contact: {contact.dict() if hasattr(contact, 'dict') else contact}")
-        try:
-            await make_outbound_call(
-                name=contact.name,
-                number=contact.phone_number,
-                message=campaign.message,
-                region=campaign.region,
-                campaign_name=campaign.campaign_name
-            )
-            successful_calls += 1
-            print(f"✅ [DEBUG] Successfully initiated call to {contact.phone_number}")
-        except Exception as e:
-            failed_calls += 1
-            print(f"❌ [DEBUG] Failed to call {contact.phone_number}: {e}")
-            print("[TRACEBACK]", traceback.format_exc())
-
-    result = {
+    print(f"☎️ [DEBUG] Queueing calls for {len(campaign.contact_list)} contacts...")
+
+    # ✅ Dial in the background; the request returns right away
+    try:
+        job = dial_contact_list.delay(
+            campaign.campaign_name,
+            campaign.message,
+            campaign.region,
+            [contact.model_dump() for contact in campaign.contact_list],
+        )
+    except Exception as e:
+        print(f"❌ [DEBUG] Failed to queue campaign: {e}")
+        print("[TRACEBACK]", traceback.format_exc())
+        raise HTTPException(status_code=500, detail="Failed to queue campaign calls")
+
+    return {
         "message": (
             f"Campaign '{campaign.campaign_name}' started. "
-            f"{successful_calls} call(s) initiated, {failed_calls} failed."
-        )
+            f"{len(campaign.contact_list)} call(s) queued."
+        ),
+        "job_id": job.id
     }
 
-    return result
+# -------------------------------
+# GET /start/{job_id} — Call Outcomes
+# -------------------------------
+@router.get("/start/{job_id}")
+def get_start_status(
+    job_id: str,
+    user: dict = Depends(get_current_user)
+):
+    job = AsyncResult(job_id, app=celery_app)
+    info = job.info if isinstance(job.info, dict) else {}
+
+    if job.state == "FAILURE":
+        raise HTTPException(status_code=500, detail=str(job.info))
+
+    return {
+        "job_id": job_id,
+        "state": job.state,
+        "total": info.get("total"),
+        "done": info.get("done", 0),
+        "failed": info.get("failed", 0),
+        "outcomes": info.get("outcomes", [])  # Filled in once the job has finished
+    }
 
 # --------------------------------------
 # POST /schedule — Schedule Campaign
@@ -88,7 +104,10 @@ def schedule_campaign(
             name=campaign_request.name,
             message=campaign_request.message,
             region=campaign_request.region,
-            status=CampaignStatus.scheduled
+            status=CampaignStatus.scheduled,
+            max_retries=campaign_request.max_retries,
+            retry_backoff=campaign_request.retry_backoff,
+            retry_backoff_max=campaign_request.retry_backoff_max
         )
         session.add(campaign)
         session.commit()
@@ -143,6 +162,9 @@ def control_campaign(
     session.add(campaign)
     session.commit()
 
+    # ✅ Push the change to workers dialing this campaign
+    campaign_signals.publish(campaign.id, campaign.status)
+
     return {
         "status": "updated",
         "campaign_id": campaign.id,
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import threading
+from collections import Counter
+from typing import Any, Optional
+
+import redis
+
+from app.config import settings
+from app.services.redis_client import get_redis
+
+
+def analysis_key(model: str, messages: list, **params) -> str:
+    """
+    Content hash of an LLM request: transcript + prompt + model + params.
+    """
+    payload = json.dumps({"model": model, "messages": messages, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCacheBackend:
+    """
+    Local disk cache shared by processes on the host, evicting least
+    recently used entries past `size_limit` bytes.
+    """
+
+    def __init__(self, directory: str, size_limit: int, ttl: int):
+        import diskcache
+        self.cache = diskcache.Cache(
+            directory,
+            size_limit=size_limit,
+            eviction_policy="least-recently-used",
+        )
+        self.ttl = ttl
+
+    def get(self, key: str) -> Any:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Any):
+        self.cache.set(key, value, expire=self.ttl)
+
+
+class RedisCacheBackend:
+    """
+    Redis cache shared by all hosts. Entries expire after `ttl`; size-based
+    eviction comes from the server's maxmemory policy (e.g. allkeys-lru).
+    """
+
+    def __init__(self, prefix: str, ttl: int):
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key: str) -> Any:
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            value = client.get(self.prefix + key)
+        except redis.RedisError as e:
+            print(f"[⚠️] AI cache Redis error: {e}")
+            return None
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any):
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+        except redis.RedisError as e:
+            print(f"[⚠️] AI cache Redis error: {e}")
+
+
+class AICache:
+    """
+    Content-addressed cache for transcripts (keyed by audio hash) and
+    analyses (keyed by request hash), with per-namespace hit-rate stats.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = Counter()
+        self.misses = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(f"{namespace}:{key}")
+        except Exception as e:
+            print(f"[⚠️] AI cache read failed: {e}")
+            value = None
+        with self._lock:
+            (self.misses if value is None else self.hits)[namespace] += 1
+        return value
+
+    def set(self, namespace: str, key: str, value: Any):
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(f"{namespace}:{key}", value)
+        except Exception as e:
+            print(f"[⚠️] AI cache write failed: {e}")
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counts and hit rate per namespace for this process.
+        """
+        namespaces = set(self.hits) | set(self.misses)
+        return {
+            ns: {
+                "hits": self.hits[ns],
+                "misses": self.misses[ns],
+                "hit_rate": round(self.hits[ns] / (self.hits[ns] + self.misses[ns]), 4),
+            }
+            for ns in sorted(namespaces)
+        }
+
+
+def build_backend():
+    backend = settings.AI_CACHE_BACKEND.lower()
+    if backend == "disk":
+        return DiskCacheBackend(settings.AI_CACHE_DIR, settings.AI_CACHE_SIZE_LIMIT, settings.AI_CACHE_TTL)
+    if backend == "redis":
+        return RedisCacheBackend("ai-cache:", settings.AI_CACHE_TTL)
+    return None
+
+
+# 🔁 Singleton cache instance
+ai_cache = AICache(build_backend())
@@ -1,89 +1,284 @@
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+
 import openai
-import requests
-import tempfile
 
 from app.config import settings
 from app.models.ai_result import AIResult
+from app.models.call_log import CallLog
 from app.models.db import Session, engine
+from app.services.audio_download import download_audio
+from app.services.chunked_transcription import transcribe_chunked
+from app.services.openai_client import async_openai
+from app.services.ai_cache import ai_cache, analysis_key
+from app.services.local_sentiment import local_sentiment
+from app.services.prompt_budget import PromptBuilder, token_usage
+from app.services.worker_loop import worker_loop
 
 openai.api_key = settings.OPENAI_API_KEY
 
+ANALYSIS_MODEL = "gpt-3.5-turbo"
+
+SUMMARY_SYSTEM = "You are a helpful assistant summarizing call transcripts."
+SUMMARY_PREFIX = "Summarize the following call transcript in a few sentences:\n\n"
+SENTIMENT_SYSTEM = "You are a sentiment analysis tool."
+SENTIMENT_PREFIX = "Determine the sentiment of the following conversation (Positive, Neutral, Negative):\n\n"
+
+# ✅ Keeps transcripts within the analysis model's prompt budget
+analysis_prompts = PromptBuilder(ANALYSIS_MODEL)
+
+# Fields returned by the combined analysis call: name -> instruction.
+# Add new per-transcript analyses here to get them from the same request.
+ANALYSIS_FIELDS = {
+    "summary": "A summary of the call in a few sentences.",
+    "sentiment": "The overall sentiment of the conversation: Positive, Neutral, or Negative.",
+}
+
+@contextmanager
+def stage_timer(timings: dict, stage: str):
+    """
+    Record how long a pipeline stage took, in seconds.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round(time.perf_counter() - started, 3)
+
 
 def transcribe_audio(audio_url: str) -> str:
     """
     Download audio from URL and transcribe using Whisper.
+    Long recordings are split at silences and transcribed in parallel.
     Returns raw transcript text.
     """
     print(f"[🎧] Downloading audio from: {audio_url}")
-    response = requests.get(audio_url)
-    response.raise_for_status()
-
-    with tempfile.NamedTemporaryFile(suffix=".mp3") as tmp:
-        tmp.write(response.content)
-        tmp.flush()
-
-        print("[🔊] Sending audio to Whisper API...")
-        transcript = openai.Audio.transcribe(
-            model="whisper-1",
-            file=open(tmp.name, "rb"),
-            response_format="text"
-        )
+    with download_audio(audio_url) as audio:
+        cached = ai_cache.get("transcript", audio.sha256)
+        if cached is not None:
+            print("[♻️] Transcript cache hit.")
+            return cached
+
+        transcript = worker_loop.run(transcribe_chunked(audio))
+        if transcript is None:
+            print(f"[🔊] Sending {audio.size} bytes of audio to Whisper API...")
+            # The spooled file is streamed to the API as-is, no extra copy
+            transcript = openai.audio.transcriptions.create(
+                model="whisper-1",
+                file=(audio.filename, audio.file),
+                response_format="text"
+            )
+        ai_cache.set("transcript", audio.sha256, transcript)
 
     print("[✅] Transcription complete.")
     return transcript
 
 
+def summary_messages(transcript: str) -> list:
+    return analysis_prompts.build("summary", SUMMARY_SYSTEM, SUMMARY_PREFIX, transcript)
+
+
+def sentiment_messages(transcript: str) -> list:
+    return analysis_prompts.build("sentiment", SENTIMENT_SYSTEM, SENTIMENT_PREFIX, transcript)
+
+
+def parse_sentiment(text: str) -> str:
+    sentiment = (text or "").strip().lower()
+    if "positive" in sentiment:
+        return "Positive"
+    elif "negative" in sentiment:
+        return "Negative"
+    else:
+        return "Neutral"
+
+
 def generate_summary(transcript: str) -> str:
     """
     Generate a GPT-based summary from the transcript.
     """
+    messages = summary_messages(transcript)
+    key = analysis_key(ANALYSIS_MODEL, messages, temperature=0.7)
+    cached = ai_cache.get("summary", key)
+    if cached is not None:
+        return cached
+
     print("[📝] Generating GPT summary...")
-    prompt = f"Summarize the following call transcript in a few sentences:\n\n{transcript}"
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
+    response = openai.chat.completions.create(
+        model=ANALYSIS_MODEL,
         temperature=0.7,
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant summarizing call transcripts."},
-            {"role": "user", "content": prompt}
-        ]
+        messages=messages
     )
+    token_usage.record("summary", response.usage)
 
     summary = response.choices[0].message.content.strip()
+    ai_cache.set("summary", key, summary)
     print("[✅] Summary generated.")
     return summary
 
 
+def local_sentiment_or_none(transcript: str):
+    """
+    Local CPU classification when SENTIMENT_BACKEND is "local", batched
+    with other transcripts being classified at the same time.
+    Returns None if disabled, unavailable or not confident enough, so GPT
+    is used instead.
+    """
+    if settings.SENTIMENT_BACKEND != "local" or local_sentiment.unavailable:
+        return None
+    try:
+        label, confidence = local_sentiment.classify_one(transcript)
+    except Exception as e:
+        print(f"[⚠️] Local sentiment failed, using GPT: {e}")
+        return None
+    if confidence < settings.SENTIMENT_MIN_CONFIDENCE:
+        print(f"[🔍] Local sentiment low confidence ({confidence:.2f}), using GPT.")
+        return None
+    return label
+
+
 def analyze_sentiment(transcript: str) -> str:
     """
-    Simple sentiment classifier using GPT.
+    Sentiment classifier: local CPU model if configured, GPT otherwise
+    (and for low-confidence local results).
     Returns: Positive, Neutral, or Negative
     """
+    local = local_sentiment_or_none(transcript)
+    if local:
+        return local
+
+    messages = sentiment_messages(transcript)
+    key = analysis_key(ANALYSIS_MODEL, messages, temperature=0.5)
+    cached = ai_cache.get("sentiment", key)
+    if cached is not None:
+        return cached
+
     print("[🔍] Analyzing sentiment...")
-    sentiment_prompt = (
-        f"Determine the sentiment of the following conversation (Positive, Neutral, Negative):\n\n{transcript}"
+    response = openai.chat.completions.create(
+        model=ANALYSIS_MODEL,
+        temperature=0.5,
+        messages=messages
     )
+    token_usage.record("sentiment", response.usage)
+    sentiment = parse_sentiment(response.choices[0].message.content)
+    ai_cache.set("sentiment", key, sentiment)
+    return sentiment
 
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
+
+async def generate_summary_async(transcript: str) -> str:
+    messages = await analysis_prompts.build_async("summary", SUMMARY_SYSTEM, SUMMARY_PREFIX, transcript)
+    key = analysis_key(ANALYSIS_MODEL, messages, temperature=0.7)
+    cached = ai_cache.get("summary", key)
+    if cached is not None:
+        return cached
+
+    response = await async_openai().chat.completions.create(
+        model=ANALYSIS_MODEL,
+        temperature=0.7,
+        messages=messages
+    )
+    token_usage.record("summary", response.usage)
+    summary = response.choices[0].message.content.strip()
+    ai_cache.set("summary", key, summary)
+    return summary
+
+
+async def analyze_sentiment_async(transcript: str) -> str:
+    local = await asyncio.to_thread(local_sentiment_or_none, transcript)
+    if local:
+        return local
+
+    messages = await analysis_prompts.build_async("sentiment", SENTIMENT_SYSTEM, SENTIMENT_PREFIX, transcript)
+    key = analysis_key(ANALYSIS_MODEL, messages, temperature=0.5)
+    cached = ai_cache.get("sentiment", key)
+    if cached is not None:
+        return cached
+
+    response = await async_openai().chat.completions.create(
+        model=ANALYSIS_MODEL,
         temperature=0.5,
-        messages=[
-            {"role": "system", "content": "You are a sentiment analysis tool."},
-            {"role": "user", "content": sentiment_prompt}
-        ]
+        messages=messages
     )
+    token_usage.record("sentiment", response.usage)
+    sentiment = parse_sentiment(response.choices[0].message.content)
+    ai_cache.set("sentiment", key, sentiment)
+    return sentiment
 
-    sentiment = response.choices[0].message.content.strip().lower()
-    if "positive" in sentiment:
-        return "Positive"
-    elif "negative" in sentiment:
-        return "Negative"
-    else:
-        return "Neutral"
+
+async def analyze_combined_async(transcript: str, fields: dict = ANALYSIS_FIELDS) -> dict:
+    """
+    One JSON-mode request returning every field in `fields` (ANALYSIS_FIELDS
+    by default), so the transcript is only sent (and billed) once.
+    """
+    listing = "\n".join(f'- "{name}": {instruction}' for name, instruction in fields.items())
+    system = "You analyze call transcripts. Reply with a JSON object with these keys:\n" + listing
+    messages = await analysis_prompts.build_async("analysis", system, "", transcript)
+    key = analysis_key(ANALYSIS_MODEL, messages, temperature=0.5, response_format="json_object")
+    cached = ai_cache.get("analysis", key)
+    if cached is not None:
+        return cached
+
+    response = await async_openai().chat.completions.create(
+        model=ANALYSIS_MODEL,
+        temperature=0.5,
+        response_format={"type": "json_object"},
+        messages=messages
+    )
+    token_usage.record("analysis", response.usage)
+    result = json.loads(response.choices[0].message.content)
+    result["summary"] = str(result.get("summary", "")).strip()
+    if "sentiment" in fields:
+        result["sentiment"] = parse_sentiment(result.get("sentiment"))
+    ai_cache.set("analysis", key, result)
+    return result
+
+
+async def analyze_transcript(transcript: str, timings: dict, mode: str = None) -> dict:
+    """
+    Run the per-transcript analyses.
+
+    Modes (AI_ANALYSIS_MODE):
+    - "concurrent": summary and sentiment requests in parallel
+    - "combined": a single structured request for all fields; with
+      SENTIMENT_BACKEND=local, a confident local sentiment is used and
+      left out of the request
+    - "sequential": one request after the other
+    """
+    mode = mode or settings.AI_ANALYSIS_MODE
+
+    async def timed(stage: str, coro):
+        with stage_timer(timings, stage):
+            return await coro
+
+    if mode == "combined":
+        print("[🧠] Running combined transcript analysis...")
+        with stage_timer(timings, "analysis"):
+            sentiment = None
+            if settings.SENTIMENT_BACKEND == "local":
+                sentiment = await timed("sentiment", asyncio.to_thread(local_sentiment_or_none, transcript))
+            if not sentiment:
+                return await analyze_combined_async(transcript)
+            fields = {name: text for name, text in ANALYSIS_FIELDS.items() if name != "sentiment"}
+            result = await analyze_combined_async(transcript, fields)
+        return {**result, "sentiment": sentiment}
+
+    print(f"[🧠] Running transcript analysis ({mode})...")
+    with stage_timer(timings, "analysis"):
+        if mode == "sequential":
+            summary = await timed("summary", generate_summary_async(transcript))
+            sentiment = await timed("sentiment", analyze_sentiment_async(transcript))
+        else:
+            summary, sentiment = await asyncio.gather(
+                timed("summary", generate_summary_async(transcript)),
+                timed("sentiment", analyze_sentiment_async(transcript)),
+            )
+    return {"summary": summary, "sentiment": sentiment}
 
 
 def save_ai_result(call_id: int, transcript: str, summary: str, sentiment: str):
     """
-    Save the AI result to the database.
+    Save the AI result to the database and copy the summary onto the call log.
     """
     with Session(engine) as session:
         ai_data = AIResult(
@@ -93,6 +288,12 @@ def save_ai_result(call_id: int, transcript: str, summary: str, sentiment: str):
             sentiment=sentiment
         )
         session.add(ai_data)
+
+        call_log = session.get(CallLog, call_id)
+        if call_log:
+            call_log.ai_summary = summary
+            session.add(call_log)
+
         session.commit()
         print(f"[💾] AI result saved for Call ID: {call_id}")
 
@@ -101,17 +302,21 @@ def process_call(audio_url: str, call_id: int) -> dict:
     """
     Run full AI pipeline and store results in DB.
     """
+    timings = {}
     try:
-        transcript = transcribe_audio(audio_url)
-        summary = generate_summary(transcript)
-        sentiment = analyze_sentiment(transcript)
+        with stage_timer(timings, "transcription"):
+            transcript = transcribe_audio(audio_url)
+
+        analysis = worker_loop.run(analyze_transcript(transcript, timings))
 
-        save_ai_result(call_id, transcript, summary, sentiment)
+        with stage_timer(timings, "save"):
+            save_ai_result(call_id, transcript, analysis["summary"], analysis["sentiment"])
 
+        print(f"[⏱️] Call ID {call_id} stage timings: {timings}")
         return {
             "transcript": transcript,
-            "summary": summary,
-            "sentiment": sentiment
+            **analysis,
+            "timings": timings
         }
     except Exception as e:
         print(f"[❌] Error during AI processing: {e}")
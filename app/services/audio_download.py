@@ -0,0 +1,120 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import settings
+
+# ----------------------------
+# Shared HTTP session
+# ----------------------------
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=settings.AUDIO_HTTP_POOL_SIZE,
+    pool_maxsize=settings.AUDIO_HTTP_POOL_SIZE,
+)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+CONTENT_TYPE_SUFFIXES = {
+    "audio/mpeg": ".mp3",
+    "audio/mp3": ".mp3",
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/ogg": ".ogg",
+    "audio/webm": ".webm",
+}
+
+
+class DownloadedAudio:
+    """
+    A downloaded recording held in a spooled temp file: in memory up to
+    AUDIO_SPOOL_MAX_BYTES, on disk beyond that. Use as a context manager.
+    """
+
+    def __init__(self, file, filename: str, size: int, sha256: str):
+        self.file = file
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256  # Hash of the audio bytes, computed while streaming
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _filename(url: str, content_type: str) -> str:
+    suffix = os.path.splitext(urlparse(url).path)[1]
+    if not suffix:
+        content_type = (content_type or "").split(";")[0].strip()
+        suffix = CONTENT_TYPE_SUFFIXES.get(content_type) or mimetypes.guess_extension(content_type) or ".mp3"
+    return f"recording{suffix}"
+
+
+def _retryable(error: requests.RequestException) -> bool:
+    """
+    Connection drops, timeouts, 5xx and 429 are worth retrying; other 4xx
+    (403, 404, ...) and bad URLs will fail the same way again.
+    """
+    if error.response is not None:
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    ))
+
+
+def download_audio(url: str) -> DownloadedAudio:
+    """
+    Stream a recording to a spooled temp file in fixed-size chunks.
+    Interrupted downloads (and 5xx/429 responses) are retried, resuming with
+    a Range request when the server supports it. Other 4xx errors fail at
+    once. Returns the file rewound to the start.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.AUDIO_SPOOL_MAX_BYTES)
+    hasher = hashlib.sha256()
+    written = 0
+    content_type = None
+
+    for attempt in range(1, settings.AUDIO_DOWNLOAD_RETRIES + 1):
+        headers = {"Range": f"bytes={written}-"} if written else {}
+        try:
+            with _session.get(
+                url, headers=headers, stream=True, timeout=settings.AUDIO_DOWNLOAD_TIMEOUT
+            ) as response:
+                response.raise_for_status()
+                content_type = content_type or response.headers.get("Content-Type")
+
+                if written and response.status_code != 206:
+                    # Server ignored the Range header; start over
+                    spool.seek(0)
+                    spool.truncate()
+                    hasher = hashlib.sha256()
+                    written = 0
+
+                for chunk in response.iter_content(chunk_size=settings.AUDIO_DOWNLOAD_CHUNK_SIZE):
+                    spool.write(chunk)
+                    hasher.update(chunk)
+                    written += len(chunk)
+            break
+        except requests.RequestException as e:
+            if attempt == settings.AUDIO_DOWNLOAD_RETRIES or not _retryable(e):
+                spool.close()
+                raise
+            print(f"[⚠️] Download interrupted at {written} bytes ({attempt}): {e}. Retrying...")
+            time.sleep(attempt)
+
+    spool.seek(0)
+    return DownloadedAudio(spool, _filename(url, content_type), written, hasher.hexdigest())
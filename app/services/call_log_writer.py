@@ -0,0 +1,155 @@
+import asyncio
+import atexit
+import json
+import os
+import threading
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from app.config import settings
+from app.models.call_log import CallLog
+from app.models.db import engine
+
+
+class CallLogWriter:
+    """
+    Write-behind buffer for CallLog rows.
+
+    Rows are collected in memory and written with one bulk INSERT when the
+    buffer reaches `batch_size` or every `flush_interval` seconds, instead of
+    one commit per dial. In sync mode (tests) every row is written at once.
+
+    Failed flushes put the rows back for the next attempt. After
+    CALL_LOG_MAX_RETRIES failures in a row, or when more than
+    CALL_LOG_MAX_BUFFERED rows are waiting, the oldest rows are appended to
+    CALL_LOG_SPILL_PATH (JSON lines) instead, so a database outage can't
+    grow the buffer without limit.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        sync: Optional[bool] = None,
+    ):
+        self.batch_size = batch_size or settings.CALL_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.CALL_LOG_FLUSH_INTERVAL
+        self.sync = settings.CALL_LOG_SYNC_WRITES if sync is None else sync
+        self._buffer: List[dict] = []
+        self._failures = 0  # Consecutive failed flushes
+        self.spilled = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _enqueue(self, call_log: CallLog) -> bool:
+        """
+        Buffer a row. Returns True if it should be flushed now.
+        """
+        row = call_log.model_dump(exclude={"id"})
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+
+        if self.sync or full:
+            return True
+        self._ensure_timer()
+        return False
+
+    def add(self, call_log: CallLog):
+        if self._enqueue(call_log):
+            self.flush()
+
+    async def add_async(self, call_log: CallLog):
+        """
+        add() for async callers (dialing on the worker loop); a flush it
+        triggers runs in a thread so in-flight dials aren't stalled.
+        """
+        if self._enqueue(call_log):
+            await asyncio.to_thread(self.flush)
+
+    def flush(self) -> int:
+        """
+        Write all buffered rows. Returns the number of rows written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+
+            try:
+                with Session(engine) as session:
+                    session.execute(insert(CallLog), rows)
+                    session.commit()
+            except Exception as e:
+                self._failures += 1
+                if self._failures >= settings.CALL_LOG_MAX_RETRIES:
+                    print(f"[❌] CallLog flush failed {self._failures} times, giving up on {len(rows)} rows: {e}")
+                    self._failures = 0
+                    self._spill(rows)
+                    return 0
+
+                print(f"[❌] CallLog flush failed, will retry {len(rows)} rows: {e}")
+                with self._lock:
+                    self._buffer[:0] = rows
+                    excess = max(0, len(self._buffer) - settings.CALL_LOG_MAX_BUFFERED)
+                    overflow = self._buffer[:excess]
+                    del self._buffer[:excess]
+                if overflow:
+                    print(f"[⚠️] CallLog buffer over {settings.CALL_LOG_MAX_BUFFERED} rows, spilling {len(overflow)} oldest.")
+                    self._spill(overflow)
+                return 0
+
+        self._failures = 0
+        return len(rows)
+
+    def _spill(self, rows: List[dict]):
+        """
+        Append rows that couldn't be written to the spill file, or drop
+        them (logged) if no spill path is set or it can't be written.
+        """
+        self.spilled += len(rows)
+        path = settings.CALL_LOG_SPILL_PATH
+        if path:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(path, "a") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, default=str) + "\n")
+                print(f"[💾] Spilled {len(rows)} CallLog rows to {path}")
+                return
+            except OSError as e:
+                print(f"[❌] Couldn't spill CallLog rows to {path}: {e}")
+        print(f"[❌] Dropped {len(rows)} CallLog rows.")
+
+    def close(self):
+        """
+        Stop the flush timer and write anything still buffered.
+        """
+        self._stop.set()
+        self.flush()
+
+    def _ensure_timer(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+# 🔁 Singleton writer instance
+call_log_writer = CallLogWriter()
+atexit.register(call_log_writer.close)
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Dict
+
+import redis
+from sqlmodel import Session
+
+from app.config import settings
+from app.models.campaign import Campaign, CampaignStatus
+from app.models.db import engine
+from app.services.redis_client import get_redis
+
+CONTROL_CHANNEL = "campaign-control"
+STATUS_KEY = "campaign:{campaign_id}:status"
+STATUS_TTL = 7 * 24 * 3600  # seconds
+
+
+class CampaignSignals:
+    """
+    Pushes campaign pause/resume/stop changes to running workers.
+
+    Control changes are published on a Redis channel and also stored under a
+    shared key so workers that start later see the latest state. Each process
+    keeps the statuses in a local dict, so the dial loop only does a dict
+    lookup. Without Redis, signals stay within the current process.
+
+    As a fallback for lost signals (publish failed, Redis backoff, listener
+    dropped), watched campaigns re-read their status from the database
+    every CAMPAIGN_SIGNAL_RECHECK seconds. That also restarts a dead listener.
+    On an event loop the re-read runs in a thread and its result is seen by
+    a later `status()` call.
+    """
+
+    def __init__(self):
+        self._status: Dict[int, CampaignStatus] = {}
+        self._checked: Dict[int, float] = {}  # campaign -> last database re-read
+        self._lock = threading.Lock()
+        self._listener = None
+        self._rechecks = set()  # Re-reads running in threads (keeps the tasks referenced)
+
+    def publish(self, campaign_id: int, status: CampaignStatus):
+        status = CampaignStatus(status)
+        self._set(campaign_id, status)
+
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.set(STATUS_KEY.format(campaign_id=campaign_id), status.value, ex=STATUS_TTL)
+            client.publish(CONTROL_CHANNEL, json.dumps({
+                "campaign_id": campaign_id,
+                "status": status.value,
+            }))
+        except redis.RedisError as e:
+            print(f"[⚠️] Failed to publish control signal for campaign {campaign_id}: {e}")
+
+    def watch(self, campaign_id: int, current: CampaignStatus):
+        """
+        Start tracking a campaign in this process, seeded from the shared
+        key (or `current` if no signal has been sent yet).
+        """
+        status = current
+        client = get_redis()
+        if client is not None:
+            try:
+                self._ensure_listener(client)
+                shared = client.get(STATUS_KEY.format(campaign_id=campaign_id))
+                if shared:
+                    status = shared
+            except redis.RedisError as e:
+                print(f"[⚠️] Control signal listener unavailable: {e}")
+        self._set(campaign_id, CampaignStatus(status))
+        with self._lock:
+            self._checked[campaign_id] = time.monotonic()
+
+    def status(self, campaign_id: int) -> CampaignStatus:
+        """
+        Latest known status for a watched campaign. A local read, except
+        for the periodic database re-read.
+        """
+        with self._lock:
+            checked = self._checked.get(campaign_id)
+            due = checked is not None and time.monotonic() - checked >= settings.CAMPAIGN_SIGNAL_RECHECK
+            if due:
+                self._checked[campaign_id] = time.monotonic()
+        if due:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._recheck(campaign_id)
+            else:
+                task = loop.create_task(asyncio.to_thread(self._recheck, campaign_id))
+                self._rechecks.add(task)
+                task.add_done_callback(self._rechecks.discard)
+        return self._status.get(campaign_id)
+
+    def _recheck(self, campaign_id: int):
+        client = get_redis()
+        if client is not None:
+            try:
+                self._ensure_listener(client)
+            except redis.RedisError as e:
+                print(f"[⚠️] Control signal listener unavailable: {e}")
+        try:
+            with Session(engine) as session:
+                campaign = session.get(Campaign, campaign_id)
+        except Exception as e:
+            print(f"[⚠️] Failed to re-read status for campaign {campaign_id}: {e}")
+            return
+        if campaign is not None and campaign.status != self._status.get(campaign_id):
+            print(f"[🔄] Campaign {campaign_id} status {campaign.status} picked up from the database")
+            self._set(campaign_id, CampaignStatus(campaign.status))
+
+    def _set(self, campaign_id: int, status: CampaignStatus):
+        with self._lock:
+            self._status[campaign_id] = status
+
+    def _ensure_listener(self, client):
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{CONTROL_CHANNEL: self._on_message})
+            self._listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _on_message(self, message):
+        try:
+            data = json.loads(message["data"])
+            self._set(int(data["campaign_id"]), CampaignStatus(data["status"]))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[⚠️] Ignoring bad control signal: {e}")
+
+
+# 🔁 Singleton signals instance
+campaign_signals = CampaignSignals()
@@ -0,0 +1,276 @@
+import asyncio
+import io
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.audio_download import DownloadedAudio
+from app.services.openai_client import async_openai
+
+FRAME_SECONDS = 0.02  # Energy frame size for silence detection
+DECODE_RATE = 16000   # Sample rate used when decoding with ffmpeg
+FEED_CHUNK_BYTES = 64 * 1024  # Recording bytes written to ffmpeg/ffprobe at a time
+ENERGY_BLOCK_FRAMES = 3000    # Frames converted to float at a time (60s)
+MIN_BYTES_PER_SECOND = 2000   # Lowest bitrate assumed when the duration is unknown (16 kbps)
+
+
+def wav_header(audio: DownloadedAudio) -> Optional[Tuple[int, int, int, int, int]]:
+    """
+    (channels, sample width, rate, frames, data offset) from a WAV header,
+    without reading the samples. None if the recording isn't a WAV file.
+    """
+    if not audio.filename.endswith(".wav"):
+        return None
+    audio.file.seek(0)
+    try:
+        with wave.open(audio.file, "rb") as wav:
+            channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+            offset = audio.file.tell()  # wave stops at the start of the data chunk
+            # Streamed WAVs can carry a bogus data size; trust the file length
+            frames = min(wav.getnframes(), (audio.size - offset) // (channels * width))
+            return channels, width, rate, frames, offset
+    except (wave.Error, EOFError):
+        return None
+    finally:
+        audio.file.seek(0)
+
+
+def feed_stdin(process: subprocess.Popen, audio: DownloadedAudio) -> threading.Thread:
+    """
+    Stream the recording to a child process's stdin in chunks from a thread,
+    so neither side holds the whole file in memory.
+    """
+    def feed():
+        audio.file.seek(0)
+        try:
+            for chunk in iter(lambda: audio.file.read(FEED_CHUNK_BYTES), b""):
+                process.stdin.write(chunk)
+        except OSError:
+            pass  # The tool stopped reading early (ffprobe usually does)
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=feed, daemon=True)
+    thread.start()
+    return thread
+
+
+def probe_duration(audio: DownloadedAudio) -> Optional[float]:
+    """
+    Recording length in seconds from ffprobe. None if ffprobe isn't on the
+    PATH or can't tell (common for MP3 read from a pipe).
+    """
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    process = subprocess.Popen(
+        [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", "-i", "pipe:0"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    feeder = feed_stdin(process, audio)
+    output = process.stdout.read()
+    process.wait()
+    feeder.join()
+    audio.file.seek(0)
+    try:
+        return float(output.decode().strip())
+    except ValueError:
+        return None
+
+
+def worth_chunking(audio: DownloadedAudio) -> bool:
+    """
+    Whether the recording is at least TRANSCRIBE_CHUNK_MIN_SECONDS long,
+    judged from the WAV header or ffprobe before anything is decoded.
+    """
+    min_seconds = settings.TRANSCRIBE_CHUNK_MIN_SECONDS
+    header = wav_header(audio)
+    if header:
+        _, _, rate, frames, _ = header
+        return frames >= rate * min_seconds
+    duration = probe_duration(audio)
+    if duration is None:
+        # Unknown length: only a file too big to be short at a low bitrate
+        return audio.size >= min_seconds * MIN_BYTES_PER_SECOND
+    return duration >= min_seconds
+
+
+def decode_pcm(audio: DownloadedAudio) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Mono 16-bit PCM samples for a recording, memory-mapped from disk so only
+    the segments being sent are read into memory. Mono 16-bit WAV is mapped
+    in place; anything else is decoded by ffmpeg (on the PATH) to a temp file.
+    Returns None if the audio can't be decoded here.
+    """
+    header = wav_header(audio)
+    if header:
+        channels, width, rate, frames, offset = header
+        if channels == 1 and width == 2:
+            # fileno() moves an in-memory spool to disk so it can be mapped
+            audio.file.fileno()
+            samples = np.memmap(audio.file, dtype="<i2", mode="r", offset=offset, shape=(frames,))
+            audio.file.seek(0)
+            return samples, rate
+
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    with tempfile.TemporaryFile() as pcm:
+        process = subprocess.Popen(
+            [ffmpeg, "-v", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(DECODE_RATE), "pipe:1"],
+            stdin=subprocess.PIPE, stdout=pcm, stderr=subprocess.PIPE,
+        )
+        feeder = feed_stdin(process, audio)
+        stderr = process.stderr.read()
+        process.wait()
+        feeder.join()
+        audio.file.seek(0)
+        if process.returncode != 0:
+            print(f"[⚠️] ffmpeg couldn't decode audio: {stderr.decode(errors='ignore')[:200]}")
+            return None
+        if os.fstat(pcm.fileno()).st_size < 2:
+            return None
+        # The mapping keeps the (already unlinked) temp file alive after close
+        return np.memmap(pcm, dtype="<i2", mode="r"), DECODE_RATE
+
+
+def frame_energy(samples: np.ndarray, frame: int) -> np.ndarray:
+    """
+    Mean square energy per frame, computed a block at a time so a long
+    recording is never converted to float all at once.
+    """
+    n_frames = len(samples) // frame
+    energy = np.empty(n_frames, dtype=np.float32)
+    for start in range(0, n_frames, ENERGY_BLOCK_FRAMES):
+        end = min(n_frames, start + ENERGY_BLOCK_FRAMES)
+        block = samples[start * frame:end * frame].astype(np.float32).reshape(end - start, frame)
+        energy[start:end] = (block ** 2).mean(axis=1)
+    return energy
+
+
+def split_points(samples: np.ndarray, rate: int, segment_seconds: float, search_seconds: float) -> List[int]:
+    """
+    Sample offsets to cut at: roughly every `segment_seconds`, moved to the
+    quietest frame within `search_seconds` of each target.
+    """
+    frame = int(rate * FRAME_SECONDS)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return []
+    energy = frame_energy(samples, frame)
+
+    step = int(segment_seconds / FRAME_SECONDS)
+    search = int(search_seconds / FRAME_SECONDS)
+    cuts, last = [], 0
+    for target in range(step, n_frames - step // 2, step):
+        lo = max(last + 1, target - search)
+        hi = min(n_frames, target + search + 1)
+        if lo >= hi:
+            continue
+        last = lo + int(np.argmin(energy[lo:hi]))
+        cuts.append(last * frame)
+    return cuts
+
+
+def segments_with_overlap(samples: np.ndarray, cuts: List[int], overlap: int) -> List[np.ndarray]:
+    bounds = [0] + cuts + [len(samples)]
+    return [
+        samples[max(0, start - overlap):min(len(samples), end + overlap)]
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+def to_wav(samples: np.ndarray, rate: int) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    buffer.seek(0)
+    return buffer
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def overlap_length(previous: List[str], current: List[str], max_words: int) -> int:
+    """
+    Number of leading words in `current` that repeat the end of `previous`.
+    """
+    tail = [_normalize(w) for w in previous[-max_words:]]
+    head = [_normalize(w) for w in current[:max_words]]
+    for k in range(min(len(tail), len(head)), 1, -1):
+        if tail[-k:] == head[:k]:
+            return k
+    return 0
+
+
+def stitch(texts: List[str], max_overlap_words: int) -> str:
+    """
+    Join segment transcripts in order, dropping words repeated in the overlaps.
+    """
+    words: List[str] = []
+    for text in texts:
+        current = (text or "").split()
+        if words:
+            current = current[overlap_length(words, current, max_overlap_words):]
+        words.extend(current)
+    return " ".join(words)
+
+
+async def transcribe_segments(segments: List[np.ndarray], rate: int) -> List[str]:
+    """
+    Transcribe segments with at most TRANSCRIBE_CONCURRENCY requests in flight.
+    Each segment is encoded to WAV only when its request starts.
+    """
+    semaphore = asyncio.Semaphore(settings.TRANSCRIBE_CONCURRENCY)
+
+    async def transcribe(i: int, segment: np.ndarray) -> str:
+        async with semaphore:
+            return await async_openai().audio.transcriptions.create(
+                model="whisper-1",
+                file=(f"segment{i}.wav", to_wav(segment, rate)),
+                response_format="text"
+            )
+
+    return await asyncio.gather(*(transcribe(i, s) for i, s in enumerate(segments)))
+
+
+async def transcribe_chunked(audio: DownloadedAudio) -> Optional[str]:
+    """
+    Transcribe a long recording as overlapping segments split at silences.
+    Returns None when the recording is short or can't be decoded, in which
+    case the caller should send it as a single request.
+    """
+    if not await asyncio.to_thread(worth_chunking, audio):
+        return None
+    decoded = await asyncio.to_thread(decode_pcm, audio)
+    if decoded is None:
+        return None
+    samples, rate = decoded
+    if len(samples) < rate * settings.TRANSCRIBE_CHUNK_MIN_SECONDS:
+        return None
+
+    cuts = split_points(
+        samples, rate, settings.TRANSCRIBE_SEGMENT_SECONDS, settings.TRANSCRIBE_SILENCE_SEARCH_SECONDS
+    )
+    overlap = int(rate * settings.TRANSCRIBE_OVERLAP_SECONDS)
+    segments = segments_with_overlap(samples, cuts, overlap)
+    print(f"[✂️] Transcribing {len(samples) / rate:.0f}s of audio as {len(segments)} segments...")
+
+    texts = await transcribe_segments(segments, rate)
+    # Overlap is shared by both neighbours (~2x overlap seconds), allow ~4 words/s
+    return stitch(texts, max_overlap_words=int(settings.TRANSCRIBE_OVERLAP_SECONDS * 8) + 2)
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session
+
+from app.config import settings
+from app.models.campaign_dial import CampaignDial
+from app.models.db import engine
+
+
+def insert_ignoring_dialed():
+    """
+    INSERT into CampaignDial that skips contacts already recorded, e.g. by
+    a shard from an earlier run of the same campaign.
+    """
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(CampaignDial).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(CampaignDial).on_conflict_do_nothing()
+    return insert(CampaignDial).prefix_with("IGNORE")  # MySQL
+
+
+class DialCheckpoint:
+    """
+    Records dialed contacts for a campaign, writing them to CampaignDial in
+    batches. A crash loses at most one unflushed batch, which is redialed
+    when the task is retried. On an event loop, use `mark_async` and
+    `async with` so the writes run in a thread.
+    """
+
+    def __init__(self, campaign_id: int, batch_size: int = None):
+        self.campaign_id = campaign_id
+        self.batch_size = batch_size or settings.CHECKPOINT_BATCH_SIZE
+        self._pending: List[dict] = []
+
+    def _add(self, contact_id: int, status: str) -> bool:
+        """
+        Queue a row. Returns True once a full batch is waiting.
+        """
+        self._pending.append({
+            "campaign_id": self.campaign_id,
+            "contact_id": contact_id,
+            "status": status,
+            "dialed_at": datetime.utcnow(),
+        })
+        return len(self._pending) >= self.batch_size
+
+    def _take(self) -> List[dict]:
+        rows, self._pending = self._pending, []
+        return rows
+
+    def _write(self, rows: List[dict]):
+        if not rows:
+            return
+        with Session(engine) as session:
+            session.execute(insert_ignoring_dialed(), rows)
+            session.commit()
+
+    def mark(self, contact_id: int, status: str):
+        if self._add(contact_id, status):
+            self.flush()
+
+    async def mark_async(self, contact_id: int, status: str):
+        if self._add(contact_id, status):
+            await self.flush_async()
+
+    def flush(self):
+        self._write(self._take())
+
+    async def flush_async(self):
+        # Rows are taken on the loop, so concurrent flushes never share a batch
+        await asyncio.to_thread(self._write, self._take())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.flush_async()
@@ -1,11 +1,10 @@
-from app.services.dialers import make_twilio_call
+from app.services.provider_router import provider_router
 from app.models.call_log import CallLog, CallStatus
-from app.models.db import engine
-from sqlmodel import Session
+from app.services.call_log_writer import call_log_writer
 
 
 def choose_provider(region: str = "global") -> str:
-    """Select provider based on region."""
+    """Preferred provider for a region; the router may pick another."""
     return "callhippo" if region.lower() == "india" else "twilio"
 
 
@@ -14,22 +13,25 @@ async def make_outbound_call(
     number: str,
     message: str,
     region: str = "global",
-    campaign_name: str = "Default"
-):
+    campaign_name: str = "Default",
+    attempt: int = 1
+) -> CallStatus:
     provider = choose_provider(region)
     status = CallStatus.initiated
     recording_url = None
+    call_sid = None
 
     try:
-        # ✅ Call the appropriate provider
-        # if provider == "callhippo":
-        #     result = await make_callhippo_call(name, number, message)
-        # else:
-        result = await make_twilio_call(name, number, message)
+        # ✅ Route to the healthiest provider for the region, with failover
+        used, result = await provider_router.place_call(
+            region, name, number, message, preferred=provider
+        )
+        provider = used or provider
 
         if result.get("status") == "success":
             status = CallStatus.completed
             recording_url = result.get("recording_url")
+            call_sid = result.get("sid")
         else:
             status = CallStatus.failed
 
@@ -37,16 +39,17 @@ async def make_outbound_call(
         print(f"[❌] Call error: {e}")
         status = CallStatus.failed
 
-    # ✅ Log into DB
-    with Session(engine) as session:
-        call_log = CallLog(
-            contact_name=name,
-            contact_number=number,
-            campaign_name=campaign_name,
-            region=region,
-            provider=provider,
-            status=status,
-            recording_url=recording_url
-        )
-        session.add(call_log)
-        session.commit()
+    # ✅ Log into DB (buffered, written in bulk)
+    await call_log_writer.add_async(CallLog(
+        contact_name=name,
+        contact_number=number,
+        campaign_name=campaign_name,
+        region=region,
+        provider=provider,
+        status=status,
+        call_sid=call_sid,
+        recording_url=recording_url,
+        attempt=attempt
+    ))
+
+    return status
@@ -1,19 +1,20 @@
-import requests
-from twilio.rest import Client
+import time
 from app.config import settings
-from app.routes.calls import pending_outbound_messages
+from app.services.message_store import outbound_message_store
+from app.services.rate_limiter import call_rate_limiter
+from app.services.twilio_transport import twilio_transport, is_provider_error
 import uuid
 
 # ------------------------------
 # TWILIO CONFIG
 # ------------------------------
-twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
 TWILIO_CALLBACK_URL = settings.TWILIO_CALLBACK_URL  # From .env
 
 
 
 # ✅ Twilio outbound call
 async def make_twilio_call(name: str, phone_number: str, message: str) -> dict:
+    started = None
     try:
         print(f"[Twilio] Calling {phone_number} for {name}...")
         
@@ -21,19 +22,35 @@ async def make_twilio_call(name: str, phone_number: str, message: str) -> dict:
         message_id = str(uuid.uuid4())
         
         # Store message temporarily
-        pending_outbound_messages[message_id] = message
+        await outbound_message_store.put_async(message_id, message)
         
         # Build callback URL with message_id
         callback_url = f"https://ai-calling.duckdns.org/v1/calls/outbound?message_id={message_id}"
         
-        call = twilio_client.calls.create(
+        # Wait for a CPS token instead of getting a 429 from Twilio
+        await call_rate_limiter.acquire("twilio", settings.TWILIO_PHONE_NUMBER)
+
+        # Non-blocking request over pooled keep-alive connections
+        started = time.monotonic()
+        call = await twilio_transport.create_call(
             to=phone_number,
             from_=settings.TWILIO_PHONE_NUMBER,
             url=callback_url,
-            method="GET"
+            method="GET",
+            status_callback=settings.TWILIO_STATUS_CALLBACK_URL
         )
         
-        return {"status": "success", "sid": call.sid, "recording_url": None}
+        return {
+            "status": "success",
+            "sid": call["sid"],
+            "recording_url": None,
+            "latency": time.monotonic() - started,
+        }
     except Exception as e:
         print(f"[❌ Twilio Error]: {e}")
-        return {"status": "failed", "error": str(e)}
\ No newline at end of file
+        return {
+            "status": "failed",
+            "error": str(e),
+            "provider_error": is_provider_error(e),
+            "latency": time.monotonic() - started if started is not None else None,
+        }
\ No newline at end of file
@@ -0,0 +1,149 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from app.config import settings
+
+
+@dataclass
+class RetryPolicy:
+    """
+    How failed dials are retried: up to `max_attempts` dials per contact,
+    waiting an exponentially growing, jittered delay between attempts.
+    """
+    max_attempts: int = 3
+    backoff: float = 3.0       # Seconds before the first retry
+    backoff_max: float = 300.0
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait after failed attempt number `attempt` (1-based).
+        Jittered between 50% and 100% of the exponential delay so retries
+        from a burst of failures don't all land at once.
+        """
+        delay = min(self.backoff_max, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+
+class DialingEngine:
+    """
+    Runs outbound dials with at most `max_in_flight` calls in progress at once.
+    A new call is only started while `should_continue()` returns True, so
+    pause/stop requests take effect before the next contact is dialed.
+
+    Failed dials are retried per `retry_policy`. The backoff wait is a timer on
+    the event loop and doesn't hold a dial slot, so other contacts keep being
+    dialed while a retry is pending. Pending retry timers are cancelled as
+    soon as dialing is interrupted.
+    """
+
+    CONTINUE_CHECK_INTERVAL = 1.0  # Seconds between pause/stop checks while only retries are pending
+
+    def __init__(self, max_in_flight: Optional[int] = None, retry_policy: Optional[RetryPolicy] = None):
+        self.max_in_flight = max(1, max_in_flight or settings.DIAL_CONCURRENCY)
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+        self.in_flight = 0
+        self.started = 0
+        self.retries = 0
+        self.interrupted = False
+
+    async def run(
+        self,
+        items: Iterable[Any],
+        dial: Callable[[Any, int], Awaitable[bool]],
+        should_continue: Optional[Callable[[], bool]] = None,
+        on_done: Optional[Callable[[Any, bool, int], Awaitable[None]]] = None,
+    ) -> bool:
+        """
+        Dial every item, keeping up to `max_in_flight` calls running.
+
+        `dial(item, attempt)` returns True on success. `on_done(item, success,
+        attempts)` is awaited once per item after its last attempt; items still
+        waiting on a retry when dialing is interrupted are not reported.
+        Returns False if dialing was interrupted by `should_continue`.
+        If `dial` or `on_done` raises, every other dial and retry is cancelled
+        (and waited for) before the error is re-raised.
+        """
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        pending = set()
+        timers = set()  # Retries waiting out their backoff
+        failures = []  # Exceptions raised by dial tasks (dial/on_done errors)
+
+        def spawn(coro, group=None):
+            task = asyncio.create_task(coro)
+            for tasks in (pending, group) if group is not None else (pending,):
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            task.add_done_callback(check_failed)
+
+        def check_failed(task):
+            if not task.cancelled() and task.exception() is not None:
+                failures.append(task.exception())
+                interrupt()  # Start nothing else
+
+        def interrupt():
+            self.interrupted = True
+            current = asyncio.current_task()
+            for timer in list(timers):
+                if timer is not current:
+                    timer.cancel()
+
+        async def start(item, attempt: int) -> bool:
+            # Wait for a free slot before deciding whether to keep going
+            await semaphore.acquire()
+            if self.interrupted or (should_continue and not should_continue()):
+                semaphore.release()
+                interrupt()
+                return False
+
+            self.in_flight += 1
+            self.started += 1
+            spawn(attempt_dial(item, attempt))
+            return True
+
+        async def attempt_dial(item, attempt: int):
+            try:
+                success = bool(await dial(item, attempt))
+            except Exception as e:
+                print(f"[❌] Dial task error: {e}")
+                success = False
+            finally:
+                self.in_flight -= 1
+                semaphore.release()
+
+            if not success and attempt < self.retry_policy.max_attempts:
+                if self.interrupted:
+                    return  # Left for the next run, like other pending retries
+                self.retries += 1
+                spawn(retry_later(item, attempt + 1, self.retry_policy.delay(attempt)), timers)
+            elif on_done:
+                await on_done(item, success, attempt)
+
+        async def retry_later(item, attempt: int, delay: float):
+            await asyncio.sleep(delay)
+            await start(item, attempt)
+
+        try:
+            for item in items:
+                if not await start(item, 1):
+                    break
+
+            # Let calls in flight and pending retries finish; keep honouring
+            # pause/stop while the only work left is retries in backoff
+            while pending and not failures:
+                await asyncio.wait(list(pending), timeout=self.CONTINUE_CHECK_INTERVAL)
+                if timers and not self.interrupted and should_continue and not should_continue():
+                    interrupt()
+            if failures:
+                raise failures[0]
+        finally:
+            if pending:
+                # Failed (or cancelled) part-way: don't leave dials running behind us
+                self.interrupted = True
+                leftover = list(pending)
+                for task in leftover:
+                    task.cancel()
+                await asyncio.gather(*leftover, return_exceptions=True)
+
+        return not self.interrupted
@@ -1,30 +1,215 @@
+import asyncio
+import re
+import time
+from typing import AsyncIterator, Optional
+
 import openai
 from app.config import settings
+from app.services.latency_stats import LatencyWindow
+from app.services.openai_client import async_openai
+from app.services.prompt_budget import PromptBuilder, token_usage
+from app.services.response_cache import response_cache
 
 openai.api_key = settings.OPENAI_API_KEY
 
+RESPONSE_MODEL = "gpt-4o"
+RESPONSE_MAX_TOKENS = 100
+RESPONSE_SYSTEM = "You are a helpful voice assistant."
+FALLBACK_RESPONSE = "I'm sorry, I didn't understand that."
+
 # This prompt can later be customized per campaign
 DEFAULT_PROMPT_PREFIX = (
     "You are an AI calling agent helping a customer. Respond clearly and politely.\n\nUser: "
 )
 
-async def generate_response(transcript: str) -> str:
+# ✅ Voice turns keep the most recent speech if the transcript is over budget
+response_prompts = PromptBuilder(RESPONSE_MODEL, max_output=RESPONSE_MAX_TOKENS, keep="tail")
+
+# Sentence end (or a line break) followed by whitespace
+SENTENCE_BREAK = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+
+def response_messages(transcript: str, prompt_prefix: str = DEFAULT_PROMPT_PREFIX) -> list:
+    return response_prompts.build("response", RESPONSE_SYSTEM, prompt_prefix, transcript)
+
+
+async def generate_response(
+    transcript: str, campaign_id: Optional[int] = None, prompt_prefix: str = DEFAULT_PROMPT_PREFIX
+) -> str:
+    """
+    Agent reply for one caller turn. Repeated turns are answered from
+    the per-campaign response cache.
+    """
     try:
-        prompt = DEFAULT_PROMPT_PREFIX + transcript
-
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful voice assistant."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=100,
+        cached = await response_cache.lookup(campaign_id, prompt_prefix, transcript)
+        if cached.reply is not None:
+            return cached.reply
+
+        response = await async_openai().chat.completions.create(
+            model=RESPONSE_MODEL,
+            messages=response_messages(transcript, prompt_prefix),
+            max_tokens=RESPONSE_MAX_TOKENS,
             temperature=0.7,
         )
+        token_usage.record("response", response.usage)
 
-        return response["choices"][0]["message"]["content"].strip()
+        reply = response.choices[0].message.content.strip()
+        response_cache.store(cached, reply)
+        return reply
 
     except Exception as e:
         print(f"[GPT ERROR] {e}")
-        return "I'm sorry, I didn't understand that."
- 
+        return FALLBACK_RESPONSE
+
+
+class ResponseStreamStats:
+    """
+    Streaming response latency for this process.
+    """
+
+    def __init__(self):
+        self.first_token = LatencyWindow()
+        self.first_fragment = LatencyWindow()
+        self.total = LatencyWindow()
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def stats(self) -> dict:
+        return {
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "time_to_first_token": self.first_token.summary(),
+            "time_to_first_fragment": self.first_fragment.summary(),
+            "total_time": self.total.summary(),
+        }
+
+
+# 🔁 Singleton stats instance
+response_stream_stats = ResponseStreamStats()
+
+
+def split_fragments(buffer: str, min_chars: int, max_chars: int) -> tuple:
+    """
+    Split finished sentences off the front of `buffer`.
+    Returns (fragments, remainder). Sentences shorter than `min_chars` are
+    held back and joined to the next one; text longer than `max_chars`
+    with no sentence break is cut at the last comma or space.
+    """
+    fragments = []
+    while True:
+        cut = None
+        for match in SENTENCE_BREAK.finditer(buffer):
+            if match.start() >= min_chars:
+                cut = match
+                break
+        if cut is not None:
+            fragments.append(buffer[:cut.start()].strip())
+            buffer = buffer[cut.end():]
+            continue
+
+        if len(buffer) > max_chars:
+            split_at = max(buffer.rfind(",", 0, max_chars), buffer.rfind(" ", 0, max_chars))
+            if split_at > 0:
+                fragments.append(buffer[:split_at + 1].strip())
+                buffer = buffer[split_at + 1:].lstrip()
+                continue
+        return [f for f in fragments if f], buffer
+
+
+async def stream_response(
+    transcript: str,
+    cancel: Optional[asyncio.Event] = None,
+    campaign_id: Optional[int] = None,
+    prompt_prefix: str = DEFAULT_PROMPT_PREFIX,
+) -> AsyncIterator[str]:
+    """
+    Stream the agent's reply as sentence-sized fragments, so TTS can start
+    speaking before the whole reply has been generated.
+    Setting `cancel` (caller barged in) or closing the generator stops
+    generation and closes the upstream stream. Cached replies are
+    yielded straight away.
+    """
+    started = time.monotonic()
+    buffer = ""
+    yielded = False
+    first_token = True
+    stream = None
+    outcome = "failed"
+
+    try:
+        cached = await response_cache.lookup(campaign_id, prompt_prefix, transcript)
+        if cached.reply is not None:
+            fragments, rest = split_fragments(
+                cached.reply, settings.RESPONSE_FRAGMENT_MIN_CHARS, settings.RESPONSE_FRAGMENT_MAX_CHARS
+            )
+            response_stream_stats.first_fragment.add((time.monotonic() - started) * 1000)
+            yielded = True
+            for fragment in fragments + ([rest.strip()] if rest.strip() else []):
+                yield fragment
+            outcome = "completed"
+            return
+
+        reply = []
+        stream = await async_openai().chat.completions.create(
+            model=RESPONSE_MODEL,
+            messages=response_messages(transcript, prompt_prefix),
+            max_tokens=RESPONSE_MAX_TOKENS,
+            temperature=0.7,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if cancel is not None and cancel.is_set():
+                outcome = "cancelled"
+                return
+            if chunk.usage is not None:
+                # Final chunk; carries no content
+                token_usage.record("response", chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if first_token:
+                first_token = False
+                response_stream_stats.first_token.add((time.monotonic() - started) * 1000)
+            reply.append(delta)
+
+            fragments, buffer = split_fragments(
+                buffer + delta, settings.RESPONSE_FRAGMENT_MIN_CHARS, settings.RESPONSE_FRAGMENT_MAX_CHARS
+            )
+            for fragment in fragments:
+                if not yielded:
+                    yielded = True
+                    response_stream_stats.first_fragment.add((time.monotonic() - started) * 1000)
+                yield fragment
+
+        if buffer.strip() and not (cancel is not None and cancel.is_set()):
+            if not yielded:
+                yielded = True
+                response_stream_stats.first_fragment.add((time.monotonic() - started) * 1000)
+            yield buffer.strip()
+        response_cache.store(cached, "".join(reply).strip())
+        outcome = "completed"
+
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        raise
+
+    except Exception as e:
+        print(f"[GPT ERROR] {e}")
+        if not yielded:
+            yield FALLBACK_RESPONSE
+
+    finally:
+        if stream is not None:
+            await stream.close()
+        if outcome == "completed":
+            response_stream_stats.completed += 1
+            response_stream_stats.total.add((time.monotonic() - started) * 1000)
+        elif outcome == "cancelled":
+            response_stream_stats.cancelled += 1
+        else:
+            response_stream_stats.failed += 1
@@ -0,0 +1,24 @@
+from collections import deque
+
+
+class LatencyWindow:
+    """
+    Rolling window of latency samples in milliseconds.
+    """
+
+    def __init__(self, size: int = 1000):
+        self.values = deque(maxlen=size)
+
+    def add(self, ms: float):
+        self.values.append(ms)
+
+    def summary(self) -> dict:
+        if not self.values:
+            return {"count": 0}
+        ordered = sorted(self.values)
+        return {
+            "count": len(ordered),
+            "avg_ms": round(sum(ordered) / len(ordered), 1),
+            "p50_ms": round(ordered[len(ordered) // 2], 1),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        }
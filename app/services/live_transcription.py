@@ -0,0 +1,315 @@
+import asyncio
+import binascii
+import time
+from typing import Awaitable, Callable, Optional, Set
+
+import numpy as np
+
+from app.config import settings
+from app.services.latency_stats import LatencyWindow
+from app.services.speech_to_text import STTBackend
+
+TWILIO_SAMPLE_RATE = 8000  # Media Streams audio is 8kHz mono μ-law
+
+
+def _ulaw_table() -> np.ndarray:
+    """
+    G.711 μ-law code -> 16-bit linear sample, for all 256 codes.
+    """
+    codes = ~np.arange(256, dtype=np.uint8)
+    exponent = (codes >> 4) & 0x07
+    mantissa = (codes & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+ULAW_TABLE = _ulaw_table()
+
+
+class PCMRingBuffer:
+    """
+    Fixed-size ring of 16-bit samples addressed by absolute sample position.
+    μ-law frames are decoded straight into the ring, no intermediate arrays.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.samples = np.zeros(capacity, dtype=np.int16)
+        self.written = 0  # Total samples ever written
+
+    def write_ulaw(self, payload: bytes) -> tuple:
+        """
+        Decode μ-law bytes into the ring. Returns the (start, end) positions written.
+        """
+        codes = np.frombuffer(payload, dtype=np.uint8)[-self.capacity:]
+        start = self.written
+        offset = start % self.capacity
+        head = min(len(codes), self.capacity - offset)
+        np.take(ULAW_TABLE, codes[:head], out=self.samples[offset:offset + head])
+        if head < len(codes):
+            np.take(ULAW_TABLE, codes[head:], out=self.samples[:len(codes) - head])
+        self.written += len(codes)
+        return start, self.written
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.written - self.capacity)
+
+    def view(self, start: int, end: int) -> np.ndarray:
+        """
+        Samples in [start, end). A view into the ring unless the range wraps.
+        """
+        start = max(start, self.oldest)
+        if end <= start:
+            return self.samples[:0]
+        offset = start % self.capacity
+        if offset + (end - start) <= self.capacity:
+            return self.samples[offset:offset + end - start]
+        return np.concatenate((self.samples[offset:], self.samples[:end % self.capacity]))
+
+
+class EnergyVAD:
+    """
+    RMS-energy voice activity detection with a minimum speech length
+    to start an utterance and a silence hangover to end it.
+    """
+
+    def __init__(self, threshold: float, min_speech: float, min_silence: float):
+        self.threshold = threshold
+        self.min_speech = min_speech
+        self.min_silence = min_silence
+        self.speaking = False
+        self.voiced = 0.0  # Seconds of consecutive speech
+        self.silent = 0.0  # Seconds of consecutive silence
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        if not len(frame):
+            return False
+        return float(np.sqrt(np.mean(np.square(frame, dtype=np.float32)))) >= self.threshold
+
+    def update(self, frame: np.ndarray, duration: float) -> Optional[str]:
+        """
+        Feed one frame. Returns "start" or "end" on a transition, else None.
+        """
+        if self.is_speech(frame):
+            self.voiced += duration
+            self.silent = 0.0
+        else:
+            self.silent += duration
+            if not self.speaking:
+                self.voiced = 0.0
+
+        if not self.speaking and self.voiced >= self.min_speech:
+            self.speaking = True
+            return "start"
+        if self.speaking and self.silent >= self.min_silence:
+            self.speaking = False
+            self.voiced = 0.0
+            return "end"
+        return None
+
+
+class Utterance:
+    def __init__(self, index: int, start: int, started_at: float):
+        self.index = index
+        self.start = start  # Absolute sample position
+        self.started_at = started_at
+        self.last_voiced = start  # Sample position after the last voiced frame
+        self.last_voiced_at = started_at
+        self.partial_at = start  # Sample position of the last partial request
+        self.first_partial_sent = False
+        self.finalized = False
+
+
+class LiveTranscriptionStats:
+    """
+    Rolling per-utterance latency stats for this process.
+    """
+
+    def __init__(self):
+        self.final_latency = LatencyWindow()
+        self.first_partial_latency = LatencyWindow()
+        self.stt_time = LatencyWindow()
+        self.utterances = 0
+
+    def stats(self) -> dict:
+        return {
+            "utterances": self.utterances,
+            "final_latency": self.final_latency.summary(),
+            "first_partial_latency": self.first_partial_latency.summary(),
+            "stt_time": self.stt_time.summary(),
+        }
+
+
+# 🔁 Singleton stats instance
+live_transcription_stats = LiveTranscriptionStats()
+
+
+class LiveTranscriber:
+    """
+    Incremental transcription for one Media Streams connection.
+    `feed` never waits on STT: partial and final requests run as tasks
+    and their events are sent through `send` (finals in utterance order).
+    """
+
+    def __init__(self, backend: STTBackend, send: Callable[[dict], Awaitable[None]], rate: int = TWILIO_SAMPLE_RATE):
+        self.backend = backend
+        self.send = send
+        self.rate = rate
+        self.ring = PCMRingBuffer(int(rate * settings.LIVE_BUFFER_SECONDS))
+        self.vad = EnergyVAD(
+            settings.LIVE_VAD_THRESHOLD, settings.LIVE_VAD_MIN_SPEECH, settings.LIVE_VAD_MIN_SILENCE
+        )
+        self.stream_sid = None
+        self.utterance: Optional[Utterance] = None
+        self.count = 0
+        self._partial_task: Optional[asyncio.Task] = None
+        self._last_final: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._send_lock = asyncio.Lock()
+
+    def start(self, info: dict):
+        """
+        Handle the Media Streams `start` message.
+        """
+        self.stream_sid = info.get("streamSid")
+        media_format = info.get("mediaFormat") or {}
+        if media_format.get("encoding", "audio/x-mulaw") != "audio/x-mulaw":
+            print(f"[⚠️] Unsupported media encoding {media_format.get('encoding')}")
+        print(f"[🎙️] Live transcription started for stream {self.stream_sid}")
+
+    def feed(self, payload: str):
+        """
+        Handle one base64 μ-law media payload. Malformed payloads are skipped.
+        """
+        try:
+            audio = binascii.a2b_base64(payload)
+        except (binascii.Error, ValueError, TypeError):
+            return
+        if not audio:
+            return
+        start, end = self.ring.write_ulaw(audio)
+        frame = self.ring.view(start, end)
+        now = time.monotonic()
+        transition = self.vad.update(frame, len(frame) / self.rate)
+
+        if transition == "start":
+            # Back up over the frames that triggered the VAD, plus a little pre-roll
+            voiced = int(self.vad.voiced * self.rate)
+            preroll = int(settings.LIVE_VAD_PREROLL * self.rate)
+            self.count += 1
+            self.utterance = Utterance(self.count, max(self.ring.oldest, end - voiced - preroll), now)
+
+        utterance = self.utterance
+        if utterance is None:
+            return
+
+        if self.vad.speaking and self.vad.silent == 0.0:
+            utterance.last_voiced = end
+            utterance.last_voiced_at = now
+
+        if transition == "end":
+            self._finalize(utterance)
+        elif end - utterance.start >= settings.LIVE_MAX_UTTERANCE_SECONDS * self.rate:
+            # Long monologue: close this utterance and carry straight on with a new one
+            utterance.last_voiced, utterance.last_voiced_at = end, now
+            self._finalize(utterance)
+            self.count += 1
+            self.utterance = Utterance(self.count, end, now)
+        else:
+            self._maybe_partial(utterance, end)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _maybe_partial(self, utterance: Utterance, end: int):
+        interval = settings.LIVE_PARTIAL_INTERVAL
+        if interval <= 0 or (self._partial_task and not self._partial_task.done()):
+            return
+        if end - utterance.partial_at < interval * self.rate:
+            return
+        utterance.partial_at = end
+        samples = self.ring.view(utterance.start, end).copy()
+        self._partial_task = self._spawn(self._partial(utterance, samples))
+
+    def _finalize(self, utterance: Utterance):
+        utterance.finalized = True
+        self.utterance = None
+        if self._partial_task and not self._partial_task.done():
+            self._partial_task.cancel()
+        # Trim the silence hangover; Whisper doesn't need it
+        tail = int(settings.LIVE_VAD_PREROLL * self.rate)
+        end = min(self.ring.written, utterance.last_voiced + tail)
+        samples = self.ring.view(utterance.start, end).copy()
+        self._last_final = self._spawn(self._final(utterance, samples, self._last_final))
+
+    async def _emit(self, event: dict):
+        async with self._send_lock:
+            await self.send(event)
+
+    async def _partial(self, utterance: Utterance, samples: np.ndarray):
+        try:
+            text = await self.backend.transcribe(samples, self.rate, final=False)
+        except Exception as e:
+            print(f"[⚠️] Partial transcription failed: {e}")
+            return
+        if utterance.finalized or not text:
+            return
+        latency = (time.monotonic() - utterance.started_at) * 1000
+        if not utterance.first_partial_sent:
+            utterance.first_partial_sent = True
+            live_transcription_stats.first_partial_latency.add(latency)
+        await self._emit({
+            "event": "partial",
+            "streamSid": self.stream_sid,
+            "utterance": utterance.index,
+            "text": text,
+            "latency_ms": round(latency, 1),
+        })
+
+    async def _final(self, utterance: Utterance, samples: np.ndarray, previous: Optional[asyncio.Task]):
+        stt_started = time.monotonic()
+        try:
+            text = await self.backend.transcribe(samples, self.rate, final=True)
+        except Exception as e:
+            print(f"[❌] Transcription failed for utterance {utterance.index}: {e}")
+            text = ""
+        stt_ms = (time.monotonic() - stt_started) * 1000
+
+        # Keep finals in utterance order
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+
+        latency = (time.monotonic() - utterance.last_voiced_at) * 1000
+        live_transcription_stats.utterances += 1
+        live_transcription_stats.final_latency.add(latency)
+        live_transcription_stats.stt_time.add(stt_ms)
+        await self._emit({
+            "event": "final",
+            "streamSid": self.stream_sid,
+            "utterance": utterance.index,
+            "text": text,
+            "audio_ms": round(len(samples) / self.rate * 1000),
+            "stt_ms": round(stt_ms, 1),
+            "latency_ms": round(latency, 1),
+        })
+
+    async def close(self):
+        """
+        End of stream: finalize any open utterance and wait for pending finals.
+        """
+        if self.utterance is not None:
+            self._finalize(self.utterance)
+        if self._last_final is not None:
+            await asyncio.gather(self._last_final, return_exceptions=True)
+        self.cancel()
+
+    def cancel(self):
+        """
+        Drop pending STT work (client went away).
+        """
+        for task in list(self._tasks):
+            task.cancel()
@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+LABELS = ["Negative", "Neutral", "Positive"]
+
+# Used as the linear head when no trained head is saved: each label is the
+# embedding of a short description, and transcripts are scored by cosine
+# similarity. Train a head with `train_head` for better accuracy.
+LABEL_PROTOTYPES = {
+    "Negative": "The customer was angry, upset, annoyed or not interested and wanted the call to end.",
+    "Neutral": "The conversation was routine and factual, without strong feelings either way.",
+    "Positive": "The customer was happy, friendly, interested and thankful for the call.",
+}
+PROTOTYPE_SCALE = 20.0  # Softmax temperature for cosine scores
+
+
+class LocalSentimentClassifier:
+    """
+    CPU sentiment classifier: a sentence-transformers encoder (torch or ONNX
+    backend) followed by a linear head. Transcripts are classified in
+    vectorized batches. Long transcripts are split into word windows whose
+    embeddings are averaged. A failed model load is remembered, so callers
+    fall back straight away instead of retrying the load every time.
+    """
+
+    def __init__(self, model_name: str, backend: str, head_path: str, window_words: int = 200):
+        self.model_name = model_name
+        self.backend = backend
+        self.head_path = head_path
+        self.window_words = window_words
+        self._encoder = None
+        self._head = None
+        self._prototypes = None
+        self._load_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Future]] = []
+        self._pending_lock = threading.Lock()
+
+    @property
+    def unavailable(self) -> bool:
+        return self._load_error is not None
+
+    def _load(self):
+        with self._lock:
+            if self._encoder is not None:
+                return
+            if self._load_error is not None:
+                raise RuntimeError(f"Local sentiment encoder unavailable: {self._load_error}")
+            try:
+                from sentence_transformers import SentenceTransformer
+
+                print(f"[🧠] Loading local sentiment encoder {self.model_name} ({self.backend})...")
+                encoder = SentenceTransformer(self.model_name, device="cpu", backend=self.backend)
+                if self.head_path and os.path.exists(self.head_path):
+                    import joblib
+                    self._head = joblib.load(self.head_path)
+                else:
+                    self._prototypes = encoder.encode(
+                        [LABEL_PROTOTYPES[label] for label in LABELS],
+                        normalize_embeddings=True,
+                    )
+                self._encoder = encoder
+            except Exception as e:
+                self._load_error = e
+                print(f"[❌] Couldn't load local sentiment encoder, disabled for this process: {e}")
+                raise
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        One normalized embedding per text, mean-pooled over word windows.
+        """
+        self._load()
+        windows, owners = [], []
+        for i, text in enumerate(texts):
+            words = (text or "").split() or [""]
+            for start in range(0, len(words), self.window_words):
+                windows.append(" ".join(words[start:start + self.window_words]))
+                owners.append(i)
+
+        vectors = self._encoder.encode(
+            windows,
+            batch_size=settings.LOCAL_SENTIMENT_BATCH_SIZE,
+            normalize_embeddings=True,
+        )
+        owners = np.asarray(owners)
+        pooled = np.zeros((len(texts), vectors.shape[1]), dtype=vectors.dtype)
+        np.add.at(pooled, owners, vectors)
+        pooled /= np.linalg.norm(pooled, axis=1, keepdims=True) + 1e-12
+        return pooled
+
+    def predict_proba(self, embeddings: np.ndarray) -> np.ndarray:
+        if self._head is not None:
+            return self._head.predict_proba(embeddings)
+        scores = embeddings @ self._prototypes.T * PROTOTYPE_SCALE
+        scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def classify(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """
+        (label, confidence) for each text.
+        """
+        if not texts:
+            return []
+        probs = self.predict_proba(self.embed(texts))
+        classes = list(self._head.classes_) if self._head is not None else LABELS
+        best = probs.argmax(axis=1)
+        return [(classes[i], float(probs[row, i])) for row, i in enumerate(best)]
+
+    def classify_one(self, text: str) -> Tuple[str, float]:
+        """
+        (label, confidence) for one text, batched with the texts other
+        threads submit within LOCAL_SENTIMENT_BATCH_WAIT seconds (e.g.
+        concurrent backfill or Celery calls).
+        """
+        future = Future()
+        with self._pending_lock:
+            self._pending.append((text, future))
+            leader = len(self._pending) == 1
+
+        if leader:
+            # First caller waits for company, then classifies the whole batch
+            time.sleep(settings.LOCAL_SENTIMENT_BATCH_WAIT)
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            try:
+                results = self.classify([t for t, _ in batch])
+                for (_, f), result in zip(batch, results):
+                    f.set_result(result)
+            except Exception as e:
+                for _, f in batch:
+                    f.set_exception(e)
+        return future.result()
+
+    def train_head(self, texts: List[str], labels: List[str]):
+        """
+        Fit a logistic-regression head on labeled transcripts and save it.
+        """
+        import joblib
+        from sklearn.linear_model import LogisticRegression
+
+        head = LogisticRegression(max_iter=1000)
+        head.fit(self.embed(texts), labels)
+        joblib.dump(head, self.head_path)
+        self._head = head
+        print(f"[💾] Sentiment head saved to {self.head_path}")
+
+
+# 🔁 Singleton classifier (model loads on first use)
+local_sentiment = LocalSentimentClassifier(
+    settings.LOCAL_SENTIMENT_MODEL,
+    settings.LOCAL_SENTIMENT_ENCODER_BACKEND,
+    settings.LOCAL_SENTIMENT_HEAD_PATH,
+)
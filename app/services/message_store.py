@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import redis
+
+from app.config import settings
+from app.services.redis_client import get_redis
+
+
+class InMemoryMessageStore:
+    """
+    Process-local store with TTL expiry and LRU eviction past `max_size`.
+    """
+
+    def __init__(self, ttl: int, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self.ttl)
+            self._items.move_to_end(key)
+            self._evict()
+
+    def pop(self, key: str) -> Optional[str]:
+        with self._lock:
+            value, expires_at = self._items.pop(key, (None, 0))
+        return value if expires_at > time.monotonic() else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict()
+            return len(self._items)
+
+    def _evict(self):
+        now = time.monotonic()
+        # Oldest entries first; expired ones are always at the front since TTL is fixed
+        while self._items:
+            key, (_, expires_at) = next(iter(self._items.items()))
+            if expires_at > now and len(self._items) <= self.max_size:
+                break
+            self._items.popitem(last=False)
+
+
+class MessageStore:
+    """
+    Short-lived key/value store shared across API processes and hosts.
+    Uses Redis (SET with EX, GETDEL) when available, otherwise an in-memory
+    TTL/LRU store. Entries that are never fetched expire after `ttl` seconds.
+    """
+
+    def __init__(self, prefix: str, ttl: int, max_size: int):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.local = InMemoryMessageStore(ttl, max_size)
+
+    def put(self, key: str, value: str):
+        client = get_redis()
+        if client is not None:
+            try:
+                client.set(self.prefix + key, value, ex=self.ttl)
+                return
+            except redis.RedisError as e:
+                print(f"[⚠️] Message store Redis error, keeping locally: {e}")
+        self.local.put(key, value)
+
+    def pop(self, key: str) -> Optional[str]:
+        """
+        Fetch and remove a value. Returns None if missing or expired.
+        """
+        client = get_redis()
+        if client is not None:
+            try:
+                value = client.getdel(self.prefix + key)
+                if value is not None:
+                    return value
+            except redis.RedisError as e:
+                print(f"[⚠️] Message store Redis error: {e}")
+        return self.local.pop(key)
+
+    async def put_async(self, key: str, value: str):
+        """
+        put() for async callers; the Redis round trip runs in a thread.
+        """
+        await asyncio.to_thread(self.put, key, value)
+
+    async def pop_async(self, key: str) -> Optional[str]:
+        """
+        pop() for async callers (webhook handlers).
+        """
+        return await asyncio.to_thread(self.pop, key)
+
+
+# 🔁 Outbound call messages, fetched by Twilio's /outbound callback
+outbound_message_store = MessageStore(
+    "outbound-message:",
+    ttl=settings.OUTBOUND_MESSAGE_TTL,
+    max_size=settings.OUTBOUND_MESSAGE_MAX,
+)
@@ -0,0 +1,20 @@
+import asyncio
+
+import openai
+
+from app.config import settings
+
+_async_client = None
+_async_client_loop = None
+
+
+def async_openai() -> openai.AsyncOpenAI:
+    """
+    Shared async OpenAI client for the current event loop.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        _async_client_loop = loop
+    return _async_client
@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, Optional
+
+import tiktoken
+
+from app.config import settings
+from app.services.ai_cache import ai_cache, analysis_key
+from app.services.openai_client import async_openai
+
+# Context window per model; budgets are capped so the reply still fits
+MODEL_CONTEXT = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+MESSAGE_OVERHEAD = 3  # Tokens added around each chat message
+REPLY_OVERHEAD = 3  # Tokens priming the assistant reply
+TRUNCATION_MARKER = "\n[...]\n"
+
+CONDENSE_SYSTEM = "You condense call transcripts."
+CONDENSE_PREFIX = (
+    "Condense this part of a call transcript. Keep names, numbers, requests, "
+    "commitments and how each speaker felt:\n\n"
+)
+
+
+@lru_cache(maxsize=None)
+def encoding_for(model: str) -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+@lru_cache(maxsize=1024)
+def count_cached(text: str, model: str) -> int:
+    """
+    Token count for prompt text that repeats across requests
+    (system prompts, instructions), tokenized once per process.
+    """
+    return len(encoding_for(model).encode(text))
+
+
+@lru_cache(maxsize=None)
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """
+    "gpt-3.5-turbo=12000,gpt-4o=4000" -> {"gpt-3.5-turbo": 12000, "gpt-4o": 4000}
+    """
+    budgets = {}
+    for item in spec.split(","):
+        model, _, tokens = item.partition("=")
+        if model.strip() and tokens.strip().isdigit():
+            budgets[model.strip()] = int(tokens)
+    return budgets
+
+
+def prompt_budget(model: str, max_output: int) -> int:
+    """
+    Max prompt tokens for a model: PROMPT_TOKEN_BUDGETS (or the default),
+    capped to the context window minus the reply.
+    """
+    budget = parse_budgets(settings.PROMPT_TOKEN_BUDGETS).get(model, settings.PROMPT_DEFAULT_BUDGET)
+    if model in MODEL_CONTEXT:
+        budget = min(budget, MODEL_CONTEXT[model] - max_output)
+    return budget
+
+
+def truncate_tokens(tokens: list, model: str, limit: int, keep: str = "head_tail") -> str:
+    """
+    Decode at most `limit` tokens. "head_tail" keeps the opening third and
+    the end of the text (how a call started and how it was resolved);
+    "tail" keeps only the most recent text.
+    """
+    encoding = encoding_for(model)
+    if len(tokens) <= limit:
+        return encoding.decode(tokens)
+    room = max(0, limit - count_cached(TRUNCATION_MARKER, model))
+    if keep == "tail":
+        return TRUNCATION_MARKER.lstrip() + encoding.decode(tokens[len(tokens) - room:])
+    head = room // 3
+    return (
+        encoding.decode(tokens[:head]) + TRUNCATION_MARKER + encoding.decode(tokens[len(tokens) - (room - head):])
+    )
+
+
+class TokenUsage:
+    """
+    Tokens per request and how often prompts had to be fitted, per purpose.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, purpose: str, usage):
+        with self._lock:
+            counts = self.counts[purpose]
+            counts["requests"] += 1
+            if usage is not None:
+                counts["prompt_tokens"] += usage.prompt_tokens
+                counts["completion_tokens"] += usage.completion_tokens
+        if usage is not None:
+            print(f"[🔢] {purpose}: {usage.prompt_tokens} prompt + {usage.completion_tokens} completion tokens")
+
+    def fitted(self, purpose: str, how: str):
+        with self._lock:
+            self.counts[purpose][how] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                purpose: {
+                    "requests": c["requests"],
+                    "prompt_tokens": c["prompt_tokens"],
+                    "completion_tokens": c["completion_tokens"],
+                    "avg_prompt_tokens": round(c["prompt_tokens"] / c["requests"], 1) if c["requests"] else 0.0,
+                    "truncated": c["truncated"],
+                    "condensed": c["condensed"],
+                }
+                for purpose, c in sorted(self.counts.items())
+            }
+
+
+# 🔁 Singleton usage instance
+token_usage = TokenUsage()
+
+
+async def condense_chunk(chunk: str, model: str, max_tokens: int, semaphore: asyncio.Semaphore) -> str:
+    messages = [
+        {"role": "system", "content": CONDENSE_SYSTEM},
+        {"role": "user", "content": CONDENSE_PREFIX + chunk},
+    ]
+    key = analysis_key(model, messages, temperature=0.3, max_tokens=max_tokens)
+    cached = ai_cache.get("condensed", key)
+    if cached is not None:
+        return cached
+
+    async with semaphore:
+        response = await async_openai().chat.completions.create(
+            model=model,
+            temperature=0.3,
+            max_tokens=max_tokens,
+            messages=messages
+        )
+    token_usage.record("condense", response.usage)
+    condensed = response.choices[0].message.content.strip()
+    ai_cache.set("condensed", key, condensed)
+    return condensed
+
+
+async def condense_transcript(transcript: str, model: str, target_tokens: int, depth: int = 0) -> str:
+    """
+    Map-reduce: condense fixed-size chunks of the transcript in parallel and
+    join the results in order, repeating (at most twice) if still too long.
+    """
+    encoding = encoding_for(model)
+    tokens = encoding.encode(transcript)
+    size = settings.PROMPT_CHUNK_TOKENS
+    chunks = [encoding.decode(tokens[i:i + size]) for i in range(0, len(tokens), size)]
+    per_chunk = max(64, target_tokens // len(chunks))
+    semaphore = asyncio.Semaphore(settings.PROMPT_MAP_CONCURRENCY)
+
+    print(f"[🗜️] Condensing {len(tokens)} transcript tokens in {len(chunks)} chunks...")
+    parts = await asyncio.gather(*(condense_chunk(c, model, per_chunk, semaphore) for c in chunks))
+    condensed = "\n".join(parts)
+    if depth < 2 and len(chunks) > 1 and len(encoding.encode(condensed)) > target_tokens:
+        return await condense_transcript(condensed, model, target_tokens, depth + 1)
+    return condensed
+
+
+_condensing: Dict[tuple, asyncio.Task] = {}
+
+
+async def condense_shared(transcript: str, model: str, target_tokens: int) -> str:
+    """
+    condense_transcript, shared by analyses running concurrently on the same
+    transcript so the chunks are only condensed once.
+    """
+    key = (hashlib.sha256(transcript.encode()).hexdigest(), model, target_tokens)
+    task = _condensing.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(condense_transcript(transcript, model, target_tokens))
+        _condensing[key] = task
+        task.add_done_callback(lambda _: _condensing.pop(key, None))
+    return await task
+
+
+class PromptBuilder:
+    """
+    Builds [system, user] messages for one model with the transcript
+    fitted to the model's prompt budget.
+    """
+
+    def __init__(self, model: str, max_output: Optional[int] = None, keep: str = "head_tail"):
+        self.model = model
+        self.max_output = max_output or settings.PROMPT_RESERVED_OUTPUT_TOKENS
+        self.keep = keep
+
+    @property
+    def budget(self) -> int:
+        return prompt_budget(self.model, self.max_output)
+
+    def room(self, system: str, prefix: str) -> int:
+        """
+        Tokens left for the transcript after the fixed parts of the prompt.
+        """
+        overhead = (
+            count_cached(system, self.model) + count_cached(prefix, self.model)
+            + 2 * MESSAGE_OVERHEAD + REPLY_OVERHEAD
+        )
+        return max(0, self.budget - overhead)
+
+    def build(self, purpose: str, system: str, prefix: str, transcript: str) -> list:
+        """
+        Messages with the transcript truncated to fit, if needed.
+        """
+        room = self.room(system, prefix)
+        tokens = encoding_for(self.model).encode(transcript)
+        if len(tokens) > room:
+            token_usage.fitted(purpose, "truncated")
+            print(f"[✂️] {purpose}: transcript truncated from {len(tokens)} to {room} tokens")
+            transcript = truncate_tokens(tokens, self.model, room, self.keep)
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prefix + transcript},
+        ]
+
+    async def build_async(self, purpose: str, system: str, prefix: str, transcript: str) -> list:
+        """
+        Like `build`, but over-budget transcripts are condensed with
+        map-reduce first when PROMPT_OVERFLOW_STRATEGY is "mapreduce".
+        """
+        if settings.PROMPT_OVERFLOW_STRATEGY == "mapreduce":
+            tokens = len(encoding_for(self.model).encode(transcript))
+            if tokens > self.room(system, prefix):
+                token_usage.fitted(purpose, "condensed")
+                # Same target for every analysis of this model, so the work is shared
+                transcript = await condense_shared(transcript, self.model, self.budget * 3 // 4)
+        return self.build(purpose, system, prefix, transcript)
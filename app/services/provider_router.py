@@ -0,0 +1,181 @@
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.providers import CallProvider, build_providers
+
+
+class ProviderHealth:
+    """
+    Rolling latency/error stats and a circuit breaker for one provider.
+    """
+
+    def __init__(self, window: int, failure_threshold: int, reset_after: float):
+        self.outcomes = deque(maxlen=window)  # (request latency seconds or None, ok)
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_progress = False
+
+    @property
+    def latency(self) -> float:
+        latencies = [latency for latency, _ in self.outcomes if latency is not None]
+        if not latencies:
+            return 0.0
+        return sum(latencies) / len(latencies)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, ok in self.outcomes if not ok) / len(self.outcomes)
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allows_call(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        # Half-open: let a single trial call through
+        return state == "half-open" and not self.trial_in_progress
+
+    def record(self, latency: Optional[float], ok: bool):
+        self.outcomes.append((latency, ok))
+        self.trial_in_progress = False
+        if ok:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            return
+        self.consecutive_failures += 1
+        if self.state == "half-open" or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class ProviderRouter:
+    """
+    Routes each call to the healthiest provider that serves its region.
+
+    Providers are ranked by rolling average API request latency, penalized
+    by error rate. The region's preferred provider (see `choose_provider`)
+    gets a bonus. A provider whose circuit is open is skipped; if every
+    circuit is open the preferred provider is still tried, so a breaker can
+    delay calls but never fail them outright.
+
+    Only provider faults (transport errors, timeouts, 5xx, 429) count
+    against health and trigger failover. A per-call rejection, such as an
+    invalid number, is returned as is.
+    """
+
+    ERROR_PENALTY = 4.0     # Score multiplier per unit of error rate
+    PREFERRED_WEIGHT = 0.5  # Score multiplier for the region's preferred provider
+
+    def __init__(self, providers: Dict[str, CallProvider]):
+        self.providers = providers
+        self.health = {
+            name: ProviderHealth(
+                settings.PROVIDER_HEALTH_WINDOW,
+                settings.PROVIDER_FAILURE_THRESHOLD,
+                settings.PROVIDER_RESET_SECONDS,
+            )
+            for name in providers
+        }
+        self.decisions = Counter()
+        self.failovers = Counter()
+
+    def rank(self, region: str, preferred: Optional[str] = None) -> List[CallProvider]:
+        """
+        Providers that serve `region` and accept calls, best first.
+        """
+        def score(provider: CallProvider) -> float:
+            health = self.health[provider.name]
+            value = (health.latency or 0.001) * (1 + self.ERROR_PENALTY * health.error_rate)
+            return value * (self.PREFERRED_WEIGHT if provider.name == preferred else 1.0)
+
+        candidates = [
+            p for p in self.providers.values()
+            if p.serves(region) and self.health[p.name].allows_call()
+        ]
+        return sorted(candidates, key=score)
+
+    def fallback(self, region: str, preferred: Optional[str] = None) -> List[CallProvider]:
+        """
+        Every circuit for the region is open: use the preferred provider
+        (or the first that serves the region) regardless.
+        """
+        serving = [p for p in self.providers.values() if p.serves(region)]
+        serving.sort(key=lambda p: p.name != preferred)
+        if serving:
+            self.decisions[f"{region}:{serving[0].name}:fallback"] += 1
+        return serving[:1]
+
+    async def place_call(
+        self, region: str, name: str, number: str, message: str, preferred: Optional[str] = None
+    ) -> Tuple[Optional[str], dict]:
+        """
+        Place a call, failing over between providers.
+        Returns (provider name used, provider result).
+        """
+        ranked = self.rank(region, preferred)
+        if not ranked:
+            ranked = self.fallback(region, preferred)
+        if not ranked:
+            return None, {"status": "failed", "error": f"No provider serves region '{region}'"}
+
+        result = None
+        for i, provider in enumerate(ranked):
+            health = self.health[provider.name]
+            if health.state == "half-open":
+                health.trial_in_progress = True
+
+            self.decisions[f"{region}:{provider.name}"] += 1
+            if i > 0:
+                self.failovers[f"{ranked[i - 1].name}->{provider.name}"] += 1
+
+            try:
+                result = await provider.place_call(name, number, message)
+            except Exception as e:
+                result = {"status": "failed", "error": str(e), "provider_error": True}
+
+            ok = result.get("status") == "success"
+            if ok or result.get("provider_error", True):
+                health.record(result.get("latency"), ok)
+            else:
+                # The provider is fine; the call itself was rejected
+                health.trial_in_progress = False
+                return provider.name, result
+
+            if ok:
+                return provider.name, result
+
+        return ranked[-1].name, result
+
+    def metrics(self) -> dict:
+        """
+        Routing decisions and per-provider health for this process.
+        """
+        return {
+            "providers": {
+                name: {
+                    "state": health.state,
+                    "avg_latency": round(health.latency, 4),
+                    "error_rate": round(health.error_rate, 4),
+                    "samples": len(health.outcomes),
+                    "consecutive_failures": health.consecutive_failures,
+                }
+                for name, health in self.health.items()
+            },
+            "decisions": dict(self.decisions),
+            "failovers": dict(self.failovers),
+        }
+
+
+# 🔁 Singleton router instance
+provider_router = ProviderRouter(build_providers())
@@ -0,0 +1,150 @@
+import asyncio
+import random
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict
+
+import httpx
+
+from app.config import settings
+from app.services.dialers import make_twilio_call
+from app.services.rate_limiter import call_rate_limiter
+from app.services.twilio_transport import is_provider_error
+
+
+class CallProvider(ABC):
+    """
+    A telephony backend that can place outbound calls.
+    `regions` lists the regions it serves; "*" means any region.
+    """
+    name = "base"
+    regions = {"*"}
+
+    def serves(self, region: str) -> bool:
+        return "*" in self.regions or region.lower() in self.regions
+
+    @abstractmethod
+    async def place_call(self, name: str, number: str, message: str) -> dict:
+        """
+        Returns {"status": "success", "sid": ..., "recording_url": ...}
+        or {"status": "failed", "error": ..., "provider_error": bool}.
+        `provider_error` is False for per-call rejections (bad number etc.).
+        Both include "latency": seconds spent on the provider's API request
+        (not rate-limit waits), or None if no request was made.
+        """
+
+
+class TwilioProvider(CallProvider):
+    name = "twilio"
+    regions = {"*"}
+
+    async def place_call(self, name: str, number: str, message: str) -> dict:
+        return await make_twilio_call(name, number, message)
+
+
+class CallHippoProvider(CallProvider):
+    """
+    CallHippo outbound calls over its REST API.
+    Only enabled when CALLHIPPO_API_URL and CALLHIPPO_API_KEY are set.
+    """
+    name = "callhippo"
+    regions = {"india"}
+
+    def __init__(self):
+        self._client = None
+        self._client_loop = None
+
+    def _http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=settings.CALLHIPPO_API_URL,
+                headers={"apiToken": settings.CALLHIPPO_API_KEY},
+                timeout=settings.TWILIO_HTTP_TIMEOUT,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def place_call(self, name: str, number: str, message: str) -> dict:
+        started = None
+        try:
+            print(f"[CallHippo] Calling {number} for {name}...")
+            await call_rate_limiter.acquire("callhippo", settings.CALLHIPPO_FROM_NUMBER)
+            started = time.monotonic()
+            response = await self._http().post("/calls", json={
+                "from": settings.CALLHIPPO_FROM_NUMBER,
+                "to": number,
+                "message": message,
+            })
+            response.raise_for_status()
+            data = response.json()
+            return {
+                "status": "success",
+                "sid": data.get("id"),
+                "recording_url": None,
+                "latency": time.monotonic() - started,
+            }
+        except Exception as e:
+            print(f"[❌ CallHippo Error]: {e}")
+            return {
+                "status": "failed",
+                "error": str(e),
+                "provider_error": is_provider_error(e),
+                "latency": time.monotonic() - started if started is not None else None,
+            }
+
+
+class FakeProvider(CallProvider):
+    """
+    Local stand-in that places no real calls. Latency and failure rate are
+    configurable so routing and failover can be exercised without a carrier.
+    """
+    name = "fake"
+    regions = {"*"}
+
+    def __init__(self, latency: float = 0.05, failure_rate: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+
+    async def place_call(self, name: str, number: str, message: str) -> dict:
+        await asyncio.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            return {
+                "status": "failed",
+                "error": "fake provider failure",
+                "provider_error": True,
+                "latency": self.latency,
+            }
+        return {
+            "status": "success",
+            "sid": f"FAKE{uuid.uuid4().hex}",
+            "recording_url": None,
+            "latency": self.latency,
+        }
+
+
+def build_providers() -> Dict[str, CallProvider]:
+    """
+    Instantiate the providers listed in CALL_PROVIDERS.
+    """
+    available = {
+        "twilio": TwilioProvider,
+        "callhippo": CallHippoProvider,
+        "fake": lambda: FakeProvider(
+            settings.FAKE_PROVIDER_LATENCY, settings.FAKE_PROVIDER_FAILURE_RATE
+        ),
+    }
+
+    providers = {}
+    for name in (p.strip().lower() for p in settings.CALL_PROVIDERS.split(",")):
+        if not name:
+            continue
+        if name not in available:
+            print(f"[⚠️] Unknown call provider '{name}', skipping.")
+            continue
+        if name == "callhippo" and not (settings.CALLHIPPO_API_URL and settings.CALLHIPPO_API_KEY):
+            print("[⚠️] CallHippo enabled but not configured, skipping.")
+            continue
+        providers[name] = available[name]()
+    return providers
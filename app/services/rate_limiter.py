@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Tuple
+
+import redis
+
+from app.config import settings
+from app.services.redis_client import get_redis
+
+# Token bucket that reserves a token and returns how long the caller must wait
+# for it. Tokens may go negative, which queues callers in arrival order.
+# Uses the Redis clock so all workers agree on "now".
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+class CallRateLimiter:
+    """
+    Calls-per-second limiter shared by every worker and API process.
+    One bucket per (provider, from-number). Backed by Redis, with an
+    in-process bucket when Redis isn't available.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, int]]):
+        # provider -> (calls per second, burst size)
+        self.limits = limits
+        self._local: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._script = None
+        self._stats: Dict[str, dict] = {}
+
+    def _reserve_redis(self, client, key: str, rate: float, burst: int) -> float:
+        if self._script is None:
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return float(self._script(keys=[key], args=[rate, burst]))
+
+    def _reserve_local(self, key: str, rate: float, burst: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, ts = self._local.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - ts) * rate) - 1
+            self._local[key] = (tokens, now)
+        return 0.0 if tokens >= 0 else -tokens / rate
+
+    def reserve(self, provider: str, from_number: str) -> float:
+        """
+        Take a token for this provider/number.
+        Returns the seconds the caller must wait before placing the call.
+        """
+        if provider not in self.limits:
+            return 0.0
+        rate, burst = self.limits[provider]
+        key = f"ratelimit:{provider}:{from_number}"
+
+        client = get_redis()
+        if client is not None:
+            try:
+                return self._reserve_redis(client, key, rate, burst)
+            except redis.RedisError as e:
+                print(f"[⚠️] Rate limiter Redis error, using local bucket: {e}")
+        return self._reserve_local(key, rate, burst)
+
+    async def acquire(self, provider: str, from_number: str) -> float:
+        """
+        Wait until a call may be placed. Returns the time waited in seconds.
+        The reservation (a Redis round trip) runs in a thread so the event
+        loop keeps serving other calls meanwhile.
+        """
+        wait = await asyncio.to_thread(self.reserve, provider, from_number)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._record(provider, from_number, wait)
+        return wait
+
+    def _record(self, provider: str, from_number: str, wait: float):
+        stats = self._stats.setdefault(
+            f"{provider}:{from_number}",
+            {"acquired": 0, "waited": 0, "total_wait": 0.0, "max_wait": 0.0},
+        )
+        stats["acquired"] += 1
+        if wait > 0:
+            stats["waited"] += 1
+            stats["total_wait"] += wait
+            stats["max_wait"] = max(stats["max_wait"], wait)
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Wait-time stats for this process, per provider/number.
+        """
+        return {
+            key: {
+                **s,
+                "avg_wait": s["total_wait"] / s["acquired"] if s["acquired"] else 0.0,
+            }
+            for key, s in self._stats.items()
+        }
+
+
+# 🔁 Singleton limiter instance
+call_rate_limiter = CallRateLimiter({
+    "twilio": (settings.TWILIO_CPS, settings.TWILIO_CPS_BURST),
+    "callhippo": (settings.CALLHIPPO_CPS, settings.CALLHIPPO_CPS_BURST),
+})
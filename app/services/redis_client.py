@@ -0,0 +1,40 @@
+import time
+import redis
+from app.config import settings
+
+# Seconds to wait before trying an unreachable Redis again
+RECONNECT_INTERVAL = 30
+
+_client = None
+_last_failure = 0.0
+
+
+def get_redis():
+    """
+    Return a shared Redis client, or None when Redis is disabled or unreachable.
+    Callers fall back to in-process state when this returns None.
+    """
+    global _client, _last_failure
+
+    if not settings.REDIS_ENABLED:
+        return None
+    if _client is not None:
+        return _client
+    if time.monotonic() - _last_failure < RECONNECT_INTERVAL:
+        return None
+
+    try:
+        client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+        )
+        client.ping()
+    except redis.RedisError as e:
+        print(f"[⚠️] Redis unavailable, using in-process fallback: {e}")
+        _last_failure = time.monotonic()
+        return None
+
+    _client = client
+    return _client
@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.openai_client import async_openai
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def normalize_transcript(text: str) -> str:
+    """
+    Lowercase, drop punctuation and collapse whitespace so trivially
+    different phrasings of the same turn share a key.
+    """
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+class CachedReply:
+    def __init__(self, reply: str, embedding: Optional[np.ndarray], latency_ms: float, ttl: int):
+        self.reply = reply
+        self.embedding = embedding
+        self.latency_ms = latency_ms  # What generating it cost; counted as saved on each hit
+        self.expires_at = time.monotonic() + ttl
+
+
+class CacheLookup:
+    """
+    Result of a lookup. On a miss, pass it back to `store` so the
+    key and embedding aren't computed twice.
+    """
+
+    def __init__(self, campaign: str, namespace: str, key: str):
+        self.campaign = campaign
+        self.namespace = namespace
+        self.key = key
+        self.reply: Optional[str] = None
+        self.kind = "miss"  # exact | semantic | miss
+        self.embedding: Optional[np.ndarray] = None
+        self.started = time.monotonic()
+
+
+class ResponseCache:
+    """
+    In-process two-tier cache for agent replies, one LRU namespace per
+    campaign + prompt. Tier 1 is an exact match on the normalized
+    transcript; tier 2 (RESPONSE_CACHE_EMBEDDINGS) is the closest cached
+    transcript by cosine similarity above RESPONSE_CACHE_SIMILARITY.
+    """
+
+    def __init__(self, max_entries: int, ttl: int, similarity: float, embeddings: str, max_words: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.embeddings = embeddings.lower()
+        self.max_words = max_words
+        self._namespaces: Dict[str, OrderedDict] = {}
+        self._matrices: Dict[str, tuple] = {}  # namespace -> (keys, stacked embeddings)
+        self._lock = threading.Lock()  # Shared by the API loop and the worker loop thread
+        self.counts: Dict[str, Counter] = defaultdict(Counter)
+        self.saved_ms: Dict[str, float] = defaultdict(float)
+
+    def namespace(self, campaign: str, prompt: str) -> str:
+        return f"{campaign}:{hashlib.sha1(prompt.encode()).hexdigest()[:12]}"
+
+    def cacheable(self, transcript: str) -> bool:
+        # Only short, common turns are worth caching
+        return self.max_entries > 0 and 0 < len(transcript.split()) <= self.max_words
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            if self.embeddings == "local":
+                from app.services.local_sentiment import local_sentiment
+                return (await asyncio.to_thread(local_sentiment.embed, [text]))[0]
+            if self.embeddings == "openai":
+                response = await async_openai().embeddings.create(model=EMBEDDING_MODEL, input=text)
+                vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+                return vector / np.linalg.norm(vector)
+        except Exception as e:
+            print(f"[⚠️] Response cache embedding failed: {e}")
+        return None
+
+    def _live_entries(self, namespace: str) -> OrderedDict:
+        entries = self._namespaces.get(namespace)
+        if entries is None:
+            return OrderedDict()
+        now = time.monotonic()
+        expired = [k for k, entry in entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del entries[key]
+        if expired:
+            self._matrices.pop(namespace, None)
+        return entries
+
+    def _nearest(self, namespace: str, embedding: np.ndarray) -> Optional[str]:
+        entries = self._live_entries(namespace)
+        if namespace not in self._matrices:
+            keys = [k for k, entry in entries.items() if entry.embedding is not None]
+            if not keys:
+                return None
+            self._matrices[namespace] = (keys, np.stack([entries[k].embedding for k in keys]))
+        keys, matrix = self._matrices[namespace]
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity and keys[best] in entries:
+            return keys[best]
+        return None
+
+    def _hit(self, lookup: CacheLookup, kind: str, key: str) -> CacheLookup:
+        entries = self._namespaces[lookup.namespace]
+        entries.move_to_end(key)
+        entry = entries[key]
+        lookup.reply = entry.reply
+        lookup.kind = kind
+        self.counts[lookup.campaign][kind] += 1
+        self.saved_ms[lookup.campaign] += max(0.0, entry.latency_ms - (time.monotonic() - lookup.started) * 1000)
+        return lookup
+
+    async def lookup(self, campaign: Optional[str], prompt: str, transcript: str) -> CacheLookup:
+        campaign = str(campaign or "default")
+        key = normalize_transcript(transcript)
+        lookup = CacheLookup(campaign, self.namespace(campaign, prompt), key)
+        if not self.cacheable(key):
+            return lookup
+
+        with self._lock:
+            if key in self._live_entries(lookup.namespace):
+                return self._hit(lookup, "exact", key)
+
+        if self.embeddings in ("local", "openai"):
+            lookup.embedding = await self.embed(key)
+            if lookup.embedding is not None:
+                with self._lock:
+                    nearest = self._nearest(lookup.namespace, lookup.embedding)
+                    if nearest is not None:
+                        return self._hit(lookup, "semantic", nearest)
+
+        with self._lock:
+            self.counts[campaign]["miss"] += 1
+        return lookup
+
+    def store(self, lookup: CacheLookup, reply: str):
+        # Never cache an empty reply (e.g. a stream that produced no text)
+        if lookup.reply is not None or not self.cacheable(lookup.key) or not (reply or "").strip():
+            return
+        latency_ms = (time.monotonic() - lookup.started) * 1000
+        with self._lock:
+            entries = self._namespaces.setdefault(lookup.namespace, OrderedDict())
+            entries[lookup.key] = CachedReply(reply, lookup.embedding, latency_ms, self.ttl)
+            entries.move_to_end(lookup.key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._matrices.pop(lookup.namespace, None)
+
+    def stats(self) -> dict:
+        """
+        Hit rates and latency saved per campaign for this process.
+        """
+        result = {}
+        with self._lock:
+            for campaign, counts in sorted(self.counts.items()):
+                lookups = sum(counts.values())
+                hits = counts["exact"] + counts["semantic"]
+                result[campaign] = {
+                    "exact_hits": counts["exact"],
+                    "semantic_hits": counts["semantic"],
+                    "misses": counts["miss"],
+                    "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                    "latency_saved_ms": round(self.saved_ms[campaign], 1),
+                    "entries": sum(
+                        len(entries) for ns, entries in self._namespaces.items()
+                        if ns.startswith(f"{campaign}:")
+                    ),
+                }
+        return result
+
+
+# 🔁 Singleton cache instance
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_MAX_ENTRIES,
+    settings.RESPONSE_CACHE_TTL,
+    settings.RESPONSE_CACHE_SIMILARITY,
+    settings.RESPONSE_CACHE_EMBEDDINGS,
+    settings.RESPONSE_CACHE_MAX_WORDS,
+)
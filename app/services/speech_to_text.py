@@ -0,0 +1,67 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, Callable
+
+import numpy as np
+
+from app.config import settings
+from app.services.chunked_transcription import to_wav
+from app.services.openai_client import async_openai
+
+
+class STTBackend(ABC):
+    """
+    Speech-to-text for a single utterance of mono 16-bit PCM.
+    `final` is False for partial results on audio that is still growing.
+    """
+    name = "base"
+
+    @abstractmethod
+    async def transcribe(self, samples: np.ndarray, rate: int, final: bool) -> str:
+        ...
+
+
+class WhisperSTT(STTBackend):
+    name = "whisper"
+
+    async def transcribe(self, samples: np.ndarray, rate: int, final: bool) -> str:
+        transcript = await async_openai().audio.transcriptions.create(
+            model="whisper-1",
+            file=("utterance.wav", to_wav(samples, rate)),
+            response_format="text"
+        )
+        return transcript.strip()
+
+
+class FakeSTT(STTBackend):
+    """
+    Local stand-in that calls no API. Returns a description of the audio
+    after a fixed delay so the live pipeline can be exercised offline.
+    """
+    name = "fake"
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+
+    async def transcribe(self, samples: np.ndarray, rate: int, final: bool) -> str:
+        await asyncio.sleep(self.latency)
+        return f"[{'final' if final else 'partial'} {len(samples) / rate:.2f}s of speech]"
+
+
+def build_stt_backend() -> STTBackend:
+    """
+    Instantiate the backend named in LIVE_STT_BACKEND.
+    """
+    available: Dict[str, Callable[[], STTBackend]] = {
+        "whisper": WhisperSTT,
+        "fake": lambda: FakeSTT(settings.FAKE_STT_LATENCY),
+    }
+    name = settings.LIVE_STT_BACKEND.strip().lower()
+    if name not in available:
+        print(f"[⚠️] Unknown STT backend '{name}', using whisper.")
+        name = "whisper"
+    return available[name]()
+
+
+# 🔁 Singleton backend instance
+stt_backend = build_stt_backend()
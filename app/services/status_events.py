@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import List
+
+import redis
+from sqlalchemy import bindparam, func, select, update
+from sqlmodel import Session
+
+from app.config import settings
+from app.models.call_log import CallLog, CallStatus
+from app.models.db import engine
+from app.services.redis_client import get_redis
+
+STATUS_QUEUE_KEY = "call-status-events"
+
+# Twilio CallStatus -> our CallStatus; in-progress states don't change the row
+TWILIO_STATUS_MAP = {
+    "completed": CallStatus.completed,
+    "busy": CallStatus.failed,
+    "failed": CallStatus.failed,
+    "no-answer": CallStatus.failed,
+    "canceled": CallStatus.failed,
+}
+
+
+class StatusEventQueue:
+    """
+    FIFO of Twilio status callbacks waiting to be applied to CallLog.
+    A Redis list shared by all API processes, or a local deque without Redis.
+    """
+
+    def __init__(self):
+        self._local = deque()
+        self._lock = threading.Lock()
+
+    def push(self, *events: dict):
+        client = get_redis()
+        if client is not None:
+            try:
+                client.rpush(STATUS_QUEUE_KEY, *(json.dumps(e) for e in events))
+                return
+            except redis.RedisError as e:
+                print(f"[⚠️] Status queue Redis error, queueing locally: {e}")
+        with self._lock:
+            self._local.extend(events)
+
+    async def push_async(self, *events: dict):
+        """
+        push() for async callers; the Redis round trip runs in a thread.
+        """
+        await asyncio.to_thread(self.push, *events)
+
+    def pop_batch(self, size: int) -> List[dict]:
+        batch = []
+        client = get_redis()
+        if client is not None:
+            try:
+                batch = [json.loads(e) for e in client.lpop(STATUS_QUEUE_KEY, size) or []]
+            except redis.RedisError as e:
+                print(f"[⚠️] Status queue Redis error: {e}")
+        with self._lock:
+            while self._local and len(batch) < size:
+                batch.append(self._local.popleft())
+        return batch
+
+
+def apply_status_events(events: List[dict]) -> List[dict]:
+    """
+    Apply a batch of status events to CallLog with one executemany UPDATE.
+    Events for the same call are merged in arrival order.
+    Returns the events whose CallLog row doesn't exist (yet).
+    """
+    merged = {}
+    for event in events:
+        row = merged.setdefault(event["call_sid"], {
+            "b_sid": event["call_sid"],
+            "b_status": None,
+            "b_duration": None,
+            "b_recording_url": None,
+        })
+        row["b_status"] = TWILIO_STATUS_MAP.get(event.get("status") or "", row["b_status"])
+        row["b_duration"] = event.get("duration") or row["b_duration"]
+        row["b_recording_url"] = event.get("recording_url") or row["b_recording_url"]
+
+    table = CallLog.__table__
+    statement = (
+        update(table)
+        .where(table.c.call_sid == bindparam("b_sid"))
+        .values(
+            status=func.coalesce(bindparam("b_status", type_=table.c.status.type), table.c.status),
+            duration=func.coalesce(bindparam("b_duration"), table.c.duration),
+            recording_url=func.coalesce(bindparam("b_recording_url"), table.c.recording_url),
+        )
+    )
+
+    with Session(engine) as session:
+        session.connection().execute(statement, list(merged.values()))
+        found = set(session.execute(
+            select(table.c.call_sid).where(table.c.call_sid.in_(list(merged)))
+        ).scalars())
+        session.commit()
+
+    return [e for e in events if e["call_sid"] not in found]
+
+
+class StatusEventConsumer:
+    """
+    Background loop that drains the status queue in batches.
+    Events that arrive before their CallLog row is written (call logs are
+    buffered) are re-queued and retried a few times before being dropped.
+    """
+
+    def __init__(self, queue: StatusEventQueue):
+        self.queue = queue
+        self._task = None
+
+    def drain(self) -> int:
+        applied = 0
+        missing = []
+        while True:
+            batch = self.queue.pop_batch(settings.STATUS_BATCH_SIZE)
+            if not batch:
+                break
+            try:
+                unmatched = apply_status_events(batch)
+            except Exception as e:
+                print(f"[❌] Failed to apply {len(batch)} status events: {e}")
+                unmatched = batch
+            applied += len(batch) - len(unmatched)
+            missing.extend(unmatched)
+            if len(batch) < settings.STATUS_BATCH_SIZE:
+                break
+
+        retry = []
+        for event in missing:
+            event["retries"] = event.get("retries", 0) + 1
+            if event["retries"] <= settings.STATUS_EVENT_MAX_RETRIES:
+                retry.append(event)
+            else:
+                print(f"[⚠️] Dropping status event for unknown call {event['call_sid']}")
+        if retry:
+            self.queue.push(*retry)
+        return applied
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.STATUS_FLUSH_INTERVAL)
+            try:
+                await asyncio.to_thread(self.drain)
+            except Exception as e:
+                print(f"[❌] Status consumer error: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.drain)
+
+
+# 🔁 Singleton queue and consumer
+status_event_queue = StatusEventQueue()
+status_event_consumer = StatusEventConsumer(status_event_queue)
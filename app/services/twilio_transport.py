@@ -0,0 +1,108 @@
+import asyncio
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+
+
+class TwilioError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Twilio API error {status_code}: {message}")
+        self.status_code = status_code
+
+
+def is_provider_error(error: Exception) -> bool:
+    """
+    True if a failed call says something about the provider's health:
+    transport errors, timeouts, 5xx and 429. Per-call rejections (other
+    4xx, e.g. an invalid To number) return False.
+    """
+    status = None
+    if isinstance(error, TwilioError):
+        status = error.status_code
+    elif isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    if status is None:
+        return True
+    return status >= 500 or status == 429
+
+
+class TwilioTransport:
+    """
+    Non-blocking Twilio REST client.
+
+    Requests share one pooled httpx.AsyncClient per event loop, so dials reuse
+    keep-alive connections instead of paying a TLS handshake each time.
+    `base_url` can point at a local fake Twilio server for testing.
+    """
+
+    def __init__(
+        self,
+        account_sid: str,
+        auth_token: str,
+        base_url: str = "https://api.twilio.com",
+        max_connections: int = 20,
+        timeout: float = 10.0,
+    ):
+        self.account_sid = account_sid
+        self.auth = (account_sid, auth_token)
+        self.base_url = base_url.rstrip("/")
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+
+    def _http(self) -> httpx.AsyncClient:
+        # Pooled connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=self.auth,
+                limits=self.limits,
+                timeout=self.timeout,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def create_call(
+        self, to: str, from_: str, url: str, method: str = "GET", status_callback: str = None
+    ) -> dict:
+        """
+        Place an outbound call. Returns Twilio's call resource as a dict.
+        """
+        data = {"To": to, "From": from_, "Url": url, "Method": method}
+        if status_callback:
+            data["StatusCallback"] = status_callback
+            data["StatusCallbackEvent"] = ["initiated", "ringing", "answered", "completed"]
+
+        response = await self._http().post(
+            f"/2010-04-01/Accounts/{self.account_sid}/Calls.json",
+            data=data,
+        )
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise TwilioError(response.status_code, message)
+        return response.json()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# 🔁 Shared transport instance
+twilio_transport = TwilioTransport(
+    settings.TWILIO_ACCOUNT_SID,
+    settings.TWILIO_AUTH_TOKEN,
+    base_url=settings.TWILIO_API_BASE_URL,
+    max_connections=settings.TWILIO_HTTP_MAX_CONNECTIONS,
+    timeout=settings.TWILIO_HTTP_TIMEOUT,
+)
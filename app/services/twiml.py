@@ -0,0 +1,74 @@
+from xml.sax.saxutils import escape
+
+# ----------------------------
+# TwiML rendering
+# ----------------------------
+# Webhooks build their responses from these helpers instead of ElementTree.
+# Verbs are plain escaped strings joined together; static responses are
+# rendered once at import and served as cached bytes.
+
+_ATTR_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+def _attrs(attributes: dict) -> str:
+    return "".join(
+        f' {name}="{escape(str(value), _ATTR_ENTITIES)}"'
+        for name, value in attributes.items()
+        if value is not None
+    )
+
+
+def say(text: str, voice: str = "alice", language: str = None) -> str:
+    return f"<Say{_attrs({'voice': voice, 'language': language})}>{escape(text)}</Say>"
+
+
+def play(url: str, loop: int = None) -> str:
+    return f"<Play{_attrs({'loop': loop})}>{escape(url)}</Play>"
+
+
+def pause(length: int = 1) -> str:
+    return f'<Pause length="{int(length)}"/>'
+
+
+def hangup() -> str:
+    return "<Hangup/>"
+
+
+def gather(
+    *verbs: str,
+    action: str = None,
+    method: str = "POST",
+    input: str = "speech dtmf",
+    timeout: int = 5,
+    num_digits: int = None,
+) -> str:
+    """
+    <Gather> wrapping nested Say/Play/Pause verbs.
+    """
+    attributes = _attrs({
+        "action": action,
+        "method": method,
+        "input": input,
+        "timeout": timeout,
+        "numDigits": num_digits,
+    })
+    return f"<Gather{attributes}>{''.join(verbs)}</Gather>"
+
+
+def response(*verbs: str) -> bytes:
+    return f"<Response>{''.join(verbs)}</Response>".encode("utf-8")
+
+
+# ✅ Per-message response: a single pre-split template, one escape per request
+_SAY_PREFIX = '<Response><Say voice="{voice}">'
+_SAY_SUFFIX = "</Say></Response>"
+
+
+def say_response(text: str, voice: str = "alice") -> bytes:
+    return f'{_SAY_PREFIX.format(voice=voice)}{escape(text)}{_SAY_SUFFIX}'.encode("utf-8")
+
+
+# ✅ Static responses, rendered once
+INBOUND_GREETING = response(
+    say("Thank you for calling AI Calling Agent. Please wait while we connect you.")
+)
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+
+class WorkerLoop:
+    """
+    One long-lived asyncio event loop per process, running in a daemon thread.
+
+    Sync code (Celery tasks) submits coroutines to it instead of calling
+    asyncio.run(), which builds and tears down a loop on every call. The loop
+    is recreated in child processes after a fork (Celery prefork pool).
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="worker-event-loop",
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the loop and wait for its result.
+        Must not be called from the loop's own thread.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def post(self, coro: Coroutine) -> Future:
+        """
+        Schedule a coroutine without waiting for it. Errors are logged.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self._log_error)
+        return future
+
+    @staticmethod
+    def _log_error(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[❌] Background task failed: {future.exception()}")
+
+
+# 🔁 Singleton loop instance
+worker_loop = WorkerLoop()
@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import Dict, Tuple
+
+import redis
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.worker import celery_app
+from app.models.ai_result import AIResult
+from app.models.db import engine
+from app.services.ai_pipeline import process_call
+from app.services.redis_client import get_redis
+
+JOB_LOCK_KEY = "ai-job:{call_id}"
+
+# Without Redis: job ids queued by this process -> when, so a job that is
+# still PENDING isn't queued a second time
+_submitted: Dict[str, float] = {}
+_submitted_lock = threading.Lock()
+
+
+def job_id_for(call_id: int) -> str:
+    # One job id per call, so re-submitting a call finds the same job
+    return f"process-ai-{call_id}"
+
+
+def get_ai_result(call_id: int):
+    with Session(engine) as session:
+        return session.exec(select(AIResult).where(AIResult.call_id == call_id)).first()
+
+
+def claim_job_lock(call_id: int) -> bool:
+    """
+    Take the per-call AI job lock. False if another job already holds it.
+    Always succeeds when Redis isn't available.
+    """
+    client = get_redis()
+    if client is None:
+        return True
+    try:
+        return bool(client.set(
+            JOB_LOCK_KEY.format(call_id=call_id), job_id_for(call_id), nx=True, ex=settings.AI_JOB_LOCK_TTL
+        ))
+    except redis.RedisError as e:
+        print(f"[⚠️] AI job lock unavailable: {e}")
+        return True
+
+
+def enqueue_process_call(call_id: int, audio_url: str) -> Tuple[str, bool]:
+    """
+    Queue AI processing for a call unless a job for it is already queued or
+    running. Returns (job_id, queued_now).
+    """
+    job_id = job_id_for(call_id)
+
+    if get_redis() is None:
+        state = celery_app.AsyncResult(job_id).state
+        now = time.monotonic()
+        with _submitted_lock:
+            for old in [j for j, at in _submitted.items() if now - at >= settings.AI_JOB_LOCK_TTL]:
+                del _submitted[old]
+            # PENDING is also what Celery reports for unknown ids; only trust it for our own
+            if state in ("STARTED", "RETRY") or (state == "PENDING" and job_id in _submitted):
+                return job_id, False
+            _submitted[job_id] = now
+    elif not claim_job_lock(call_id):
+        return job_id, False
+
+    try:
+        process_call_task.apply_async(args=[call_id, audio_url], task_id=job_id)
+    except Exception:
+        # Nothing was queued; don't block resubmits for AI_JOB_LOCK_TTL
+        release_job_lock(call_id)
+        with _submitted_lock:
+            _submitted.pop(job_id, None)
+        raise
+    return job_id, True
+
+
+def release_job_lock(call_id: int):
+    client = get_redis()
+    if client is not None:
+        try:
+            client.delete(JOB_LOCK_KEY.format(call_id=call_id))
+        except redis.RedisError as e:
+            print(f"[⚠️] Failed to release AI job lock for call {call_id}: {e}")
+
+
+@celery_app.task(name="app.tasks.ai.process_call", track_started=True)
+def process_call_task(call_id: int, audio_url: str) -> dict:
+    """
+    Run the AI pipeline for a call on the `ai` queue.
+    Calls that already have an AIResult are not processed again.
+    """
+    try:
+        existing = get_ai_result(call_id)
+        if existing:
+            print(f"[♻️] Call ID {call_id} already processed, skipping.")
+            return {
+                "transcript": existing.transcript,
+                "summary": existing.summary,
+                "sentiment": existing.sentiment,
+            }
+
+        result = process_call(audio_url=audio_url, call_id=call_id)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+    finally:
+        release_job_lock(call_id)
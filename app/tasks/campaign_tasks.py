@@ -1,18 +1,195 @@
-import time
 import asyncio
+import time
+from typing import Optional
+
+import redis
+from celery import chord
 from app.worker import celery_app
+from app.config import settings
 from app.services.dialer import make_outbound_call
+from app.services.dialing_engine import DialingEngine, RetryPolicy
+from app.services.dial_checkpoint import DialCheckpoint
+from app.services.campaign_signals import campaign_signals
+from app.services.call_log_writer import call_log_writer
+from app.services.worker_loop import worker_loop
+from app.services.redis_client import get_redis
+from app.models.call_log import CallStatus
 from app.models.campaign import Campaign, CampaignStatus
+from app.models.campaign_dial import CampaignDial
 from app.models.contact import Contact
 from app.models.db import engine
 from sqlmodel import Session, select
 from app.websockets.manager import manager
 
-MAX_RETRIES = 3       # Maximum number of retries
-RETRY_DELAY = 3       # Seconds to wait between retries
 
-@celery_app.task(name="app.tasks.run_campaign")
-def run_campaign(campaign_id: int):
+RUN_LOCK_KEY = "campaign-run:{campaign_id}"
+
+
+def claim_run_lock(campaign_id: int) -> bool:
+    """
+    Take the per-campaign run lock, held from fan-out until the chord
+    finishes. False while shards from an earlier run are still alive.
+    Always succeeds when Redis isn't available.
+    """
+    client = get_redis()
+    if client is None:
+        return True
+    try:
+        return bool(client.set(
+            RUN_LOCK_KEY.format(campaign_id=campaign_id), "1", nx=True, ex=settings.CAMPAIGN_RUN_LOCK_TTL
+        ))
+    except redis.RedisError as e:
+        print(f"[⚠️] Campaign run lock unavailable: {e}")
+        return True
+
+
+def refresh_run_lock(campaign_id: int):
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.expire(RUN_LOCK_KEY.format(campaign_id=campaign_id), settings.CAMPAIGN_RUN_LOCK_TTL)
+    except redis.RedisError as e:
+        print(f"[⚠️] Failed to refresh run lock for campaign {campaign_id}: {e}")
+
+
+def release_run_lock(campaign_id: int):
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.delete(RUN_LOCK_KEY.format(campaign_id=campaign_id))
+    except redis.RedisError as e:
+        print(f"[⚠️] Failed to release run lock for campaign {campaign_id}: {e}")
+
+
+def post_progress(message: str):
+    """
+    Queue a progress broadcast on the worker loop without waiting for it.
+    """
+    worker_loop.post(manager.broadcast(message))
+
+
+async def dial_contact(campaign: Campaign, contact: Contact, attempt: int) -> bool:
+    """
+    Make one dial attempt for a contact. Retries are scheduled by the engine.
+    """
+    try:
+        status = await make_outbound_call(
+            name=contact.name,
+            number=contact.phone_number,
+            message=campaign.message,
+            region=campaign.region,
+            campaign_name=campaign.name,
+            attempt=attempt,
+        )
+    except Exception as e:
+        print(f"[❌] Call error for {contact.phone_number}: {e}")
+        status = CallStatus.failed
+
+    if status != CallStatus.failed:
+        print(f"[✅] Call successful: {contact.phone_number}")
+        post_progress(
+            f"📞 Called {contact.name} ({contact.phone_number}) in campaign '{campaign.name}'"
+        )
+        return True
+
+    print(f"[❌] Call failed ({attempt}/{campaign.max_retries}) for {contact.phone_number}")
+    return False
+
+
+async def dial_campaign(campaign: Campaign, contacts: list) -> bool:
+    """
+    Dial all contacts with up to DIAL_CONCURRENCY calls in flight,
+    checkpointing each contact once its dial is finished.
+    Returns False if the campaign was paused or stopped part-way.
+    """
+    dialing = DialingEngine(
+        settings.DIAL_CONCURRENCY,
+        RetryPolicy(campaign.max_retries, campaign.retry_backoff, campaign.retry_backoff_max),
+    )
+
+    async def contact_done(contact: Contact, success: bool, attempts: int):
+        await checkpoint.mark_async(contact.id, CallStatus.completed if success else CallStatus.failed)
+        if not success:
+            print(f"[🚫] All retries failed for {contact.phone_number}")
+            post_progress(
+                f"🚫 Failed to call {contact.name} ({contact.phone_number}) after {attempts} attempts"
+            )
+
+    lock_refreshed = time.monotonic()
+
+    def still_running() -> bool:
+        nonlocal lock_refreshed
+        # Keep the run lock alive while this shard is dialing
+        if time.monotonic() - lock_refreshed > settings.CAMPAIGN_RUN_LOCK_TTL / 3:
+            refresh_run_lock(campaign.id)
+            lock_refreshed = time.monotonic()
+        # ✅ Check for pause/stop before each call (pushed via campaign_signals)
+        return campaign_signals.status(campaign.id) == CampaignStatus.running
+
+    async with DialCheckpoint(campaign.id) as checkpoint:
+        return await dialing.run(
+            contacts,
+            lambda contact, attempt: dial_contact(campaign, contact, attempt),
+            should_continue=still_running,
+            on_done=contact_done,
+        )
+
+
+def undialed_contacts(campaign_id: int, region: str) -> tuple:
+    """
+    WHERE clauses for the region's contacts this campaign hasn't dialed yet.
+    """
+    dialed = select(CampaignDial.contact_id).where(CampaignDial.campaign_id == campaign_id)
+    return Contact.region == region, Contact.id.not_in(dialed)
+
+
+def contact_shards(session: Session, campaign: Campaign, shard_size: int):
+    """
+    Split the campaign's undialed contacts into keyset ranges of `shard_size`.
+    Yields (first_id, last_id); the final shard is open-ended (last_id=None).
+    """
+    remaining = select(Contact.id).where(*undialed_contacts(campaign.id, campaign.region))
+    last_id = 0
+    while True:
+        first_id = session.exec(
+            remaining.where(Contact.id > last_id).order_by(Contact.id).limit(1)
+        ).first()
+        if first_id is None:
+            return
+
+        end_id = session.exec(
+            remaining.where(Contact.id >= first_id)
+            .order_by(Contact.id)
+            .offset(shard_size - 1)
+            .limit(1)
+        ).first()
+        if end_id is None:
+            yield first_id, None
+            return
+
+        yield first_id, end_id
+        last_id = end_id
+
+
+def complete_campaign(session: Session, campaign: Campaign):
+    # ✅ Mark campaign as completed
+    campaign.status = CampaignStatus.completed
+    session.add(campaign)
+    session.commit()
+    print(f"[✅] Campaign ID {campaign.id} completed.")
+    post_progress(f"✅ Campaign '{campaign.name}' completed.")
+
+
+@celery_app.task(name="app.tasks.run_campaign", bind=True, max_retries=None)
+def run_campaign(self, campaign_id: int):
+    """
+    Split the campaign into contact-range shards and dial them in parallel
+    across workers. `finish_campaign` runs once every shard has returned.
+    Waits (by retrying) while shards from a previous run are still alive,
+    so a quick pause/resume never has two runs dialing the same contacts.
+    """
     print(f"[🎯] Running campaign ID: {campaign_id}")
 
     with Session(engine) as session:
@@ -22,64 +199,165 @@ def run_campaign(campaign_id: int):
             print(f"[❌] Campaign not found: ID {campaign_id}")
             return
 
-        if campaign.status in [CampaignStatus.stopped, CampaignStatus.completed]:
-            print(f"[🛑] Campaign ID {campaign_id} is not eligible to run.")
+        # Scheduled, or resumed (set to running by the route). Anything else,
+        # e.g. paused again while this run waited for the lock, stays put.
+        if campaign.status not in (CampaignStatus.scheduled, CampaignStatus.running):
+            print(f"[🛑] Campaign ID {campaign_id} is {campaign.status.value}, not eligible to run.")
             return
 
+        if not claim_run_lock(campaign_id):
+            print(f"[⏳] Campaign ID {campaign_id} still has shards from a previous run; retrying.")
+            raise self.retry(countdown=settings.CAMPAIGN_RUN_LOCK_RETRY)
+
         # ✅ Mark campaign as running
         campaign.status = CampaignStatus.running
         session.add(campaign)
         session.commit()
+        campaign_signals.publish(campaign.id, CampaignStatus.running)
 
-        contacts = session.exec(
-            select(Contact).where(Contact.region == campaign.region)
-        ).all()
-
-        for contact in contacts:
-            session.refresh(campaign)
-
-            # ✅ Check for pause/stop before each call
-            if campaign.status == CampaignStatus.paused:
-                print(f"[⏸️] Campaign {campaign.id} paused. Exiting early.")
-                asyncio.run(manager.broadcast(f"⏸️ Campaign {campaign.name} paused."))
-                return
-            if campaign.status == CampaignStatus.stopped:
-                print(f"[🛑] Campaign {campaign.id} stopped. Exiting early.")
-                asyncio.run(manager.broadcast(f"🛑 Campaign {campaign.name} stopped."))
-                return
-
-            retries = 0
-            success = False
-
-            while retries < MAX_RETRIES and not success:
-                try:
-                    make_outbound_call(
-                        name=contact.name,
-                        number=contact.phone_number,
-                        message=campaign.message,
-                        region=campaign.region,
-                        campaign_name=campaign.name,
-                    )
-                    success = True
-                    print(f"[✅] Call successful: {contact.phone_number}")
-                    asyncio.run(manager.broadcast(
-                        f"📞 Called {contact.name} ({contact.phone_number}) in campaign '{campaign.name}'"
-                    ))
-                except Exception as e:
-                    retries += 1
-                    print(f"[❌] Call failed ({retries}/{MAX_RETRIES}) for {contact.phone_number}: {e}")
-                    if retries < MAX_RETRIES:
-                        time.sleep(RETRY_DELAY)
-
-            if not success:
-                print(f"[🚫] All retries failed for {contact.phone_number}")
-                asyncio.run(manager.broadcast(
-                    f"🚫 Failed to call {contact.name} ({contact.phone_number}) after {MAX_RETRIES} retries"
-                ))
-
-        # ✅ Mark campaign as completed
-        campaign.status = CampaignStatus.completed
-        session.add(campaign)
-        session.commit()
-        print(f"[✅] Campaign ID {campaign.id} completed.")
-        asyncio.run(manager.broadcast(f"✅ Campaign '{campaign.name}' completed."))
+        # Contacts already dialed (before a pause or crash) are skipped
+        shards = list(contact_shards(session, campaign, settings.CAMPAIGN_SHARD_SIZE))
+        if not shards:
+            complete_campaign(session, campaign)
+            release_run_lock(campaign_id)
+            return
+
+    print(f"[🧩] Campaign ID {campaign_id} split into {len(shards)} shard(s).")
+    try:
+        chord([
+            run_campaign_shard.s(campaign_id, first_id, last_id)
+            for first_id, last_id in shards
+        ])(finish_campaign.s(campaign_id).on_error(campaign_chord_failed.s(campaign_id)))
+    except Exception:
+        release_run_lock(campaign_id)
+        raise
+
+
+# acks_late: a shard lost with its worker is redelivered and resumes from its checkpoint
+@celery_app.task(name="app.tasks.run_campaign_shard", acks_late=True, reject_on_worker_lost=True)
+def run_campaign_shard(campaign_id: int, first_id: int, last_id: Optional[int] = None) -> dict:
+    """
+    Dial the campaign's contacts with first_id <= Contact.id <= last_id.
+    Errors are reported in the result rather than raised, so the chord
+    callback always runs and can pause the campaign.
+    """
+    try:
+        return dial_shard(campaign_id, first_id, last_id)
+    except Exception as e:
+        print(f"[❌] Campaign {campaign_id} shard {first_id}-{last_id or 'end'} failed: {e}")
+        return {"finished": False, "dialed": 0, "error": str(e)}
+
+
+def dial_shard(campaign_id: int, first_id: int, last_id: Optional[int]) -> dict:
+    with Session(engine) as session:
+        campaign = session.get(Campaign, campaign_id)
+        if not campaign or campaign.status != CampaignStatus.running:
+            return {"finished": False, "dialed": 0}
+
+        query = select(Contact).where(
+            *undialed_contacts(campaign_id, campaign.region),
+            Contact.id >= first_id,
+        )
+        if last_id is not None:
+            query = query.where(Contact.id <= last_id)
+        contacts = session.exec(query.order_by(Contact.id)).all()
+        campaign_signals.watch(campaign_id, campaign.status)
+        refresh_run_lock(campaign_id)
+
+        print(f"[🧩] Campaign {campaign_id} shard {first_id}-{last_id or 'end'}: {len(contacts)} contacts")
+        finished = worker_loop.run(dial_campaign(campaign, contacts))
+        call_log_writer.flush()
+        return {"finished": finished, "dialed": len(contacts)}
+
+
+@celery_app.task(name="app.tasks.finish_campaign")
+def finish_campaign(shard_results: list, campaign_id: int):
+    """
+    Chord callback: mark the campaign completed only if every shard finished.
+    """
+    release_run_lock(campaign_id)
+    with Session(engine) as session:
+        campaign = session.get(Campaign, campaign_id)
+        if not campaign:
+            return
+
+        errors = [r["error"] for r in shard_results if r.get("error")]
+        if errors and campaign.status == CampaignStatus.running:
+            pause_after_error(session, campaign, errors[0])
+        elif all(r["finished"] for r in shard_results) and campaign.status == CampaignStatus.running:
+            complete_campaign(session, campaign)
+        elif campaign.status == CampaignStatus.paused:
+            print(f"[⏸️] Campaign {campaign.id} paused. Exiting early.")
+            post_progress(f"⏸️ Campaign {campaign.name} paused.")
+        elif campaign.status == CampaignStatus.stopped:
+            print(f"[🛑] Campaign {campaign.id} stopped. Exiting early.")
+            post_progress(f"🛑 Campaign {campaign.name} stopped.")
+
+
+def pause_after_error(session: Session, campaign: Campaign, error: str):
+    """
+    Park a campaign whose run failed as paused, so it can be resumed.
+    """
+    campaign.status = CampaignStatus.paused
+    session.add(campaign)
+    session.commit()
+    campaign_signals.publish(campaign.id, CampaignStatus.paused)
+    print(f"[⚠️] Campaign {campaign.id} paused after an error: {error}")
+    post_progress(f"⚠️ Campaign {campaign.name} paused after an error. Resume it to retry.")
+
+
+@celery_app.task(name="app.tasks.campaign_chord_failed")
+def campaign_chord_failed(request, exc, traceback, campaign_id: int):
+    """
+    Chord errback: a shard or the callback raised anyway (e.g. lost result).
+    Release the run lock and pause the campaign instead of leaving it running.
+    """
+    release_run_lock(campaign_id)
+    with Session(engine) as session:
+        campaign = session.get(Campaign, campaign_id)
+        if campaign and campaign.status == CampaignStatus.running:
+            pause_after_error(session, campaign, str(exc))
+
+
+@celery_app.task(name="app.tasks.dial_contact_list", bind=True)
+def dial_contact_list(self, campaign_name: str, message: str, region: str, contacts: list) -> dict:
+    """
+    Dial an ad-hoc contact list from /start with bounded concurrency.
+    Progress counts are published as task state for the status endpoint;
+    per-contact outcomes are only in the final result.
+    """
+    outcomes = []
+    failed = 0
+
+    def progress() -> dict:
+        return {"total": len(contacts), "done": len(outcomes), "failed": failed}
+
+    async def dial(contact: dict, attempt: int) -> bool:
+        status = await make_outbound_call(
+            name=contact["name"],
+            number=contact["phone_number"],
+            message=message,
+            region=region,
+            campaign_name=campaign_name,
+            attempt=attempt,
+        )
+        return status != CallStatus.failed
+
+    async def contact_done(contact: dict, success: bool, attempts: int):
+        nonlocal failed
+        if not success:
+            failed += 1
+        outcomes.append({
+            **contact,
+            "status": (CallStatus.completed if success else CallStatus.failed).value,
+        })
+        if len(outcomes) % settings.JOB_PROGRESS_EVERY == 0:
+            # Result backend write; keep it off the dialing loop
+            await asyncio.to_thread(self.update_state, state="PROGRESS", meta=progress())
+
+    print(f"[☎️] Dialing {len(contacts)} contacts for '{campaign_name}'")
+    self.update_state(state="PROGRESS", meta=progress())
+    dialing = DialingEngine(settings.DIAL_CONCURRENCY)
+    worker_loop.run(dialing.run(contacts, dial, on_done=contact_done))
+    call_log_writer.flush()
+    return {**progress(), "outcomes": outcomes}
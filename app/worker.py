@@ -1,14 +1,27 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown
 from app.config import settings
 
 # Create the Celery app
 celery_app = Celery(
     "campaign_worker",
     broker=settings.REDIS_URL,
-    backend=settings.REDIS_URL
+    backend=settings.REDIS_URL,
+    include=["app.tasks.campaign_tasks", "app.tasks.ai_tasks"]
 )
 
+# AI post-processing gets its own queue so it can run with its own concurrency:
+#   celery -A app.worker worker -Q campaigns
+#   celery -A app.worker worker -Q ai --concurrency=4
 celery_app.conf.task_routes = {
+    "app.tasks.ai.*": {"queue": "ai"},
     "app.tasks.*": {"queue": "campaigns"}
 }
+
+
+# ✅ Write out buffered call logs before a worker process exits
+@worker_process_shutdown.connect
+def flush_call_logs(**kwargs):
+    from app.services.call_log_writer import call_log_writer
+    call_log_writer.close()
  
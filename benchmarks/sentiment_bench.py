@@ -0,0 +1,48 @@
+"""
+Sentiment throughput: local CPU classifier vs the GPT path.
+
+Run from the repo root:
+    python -m benchmarks.sentiment_bench            # local only
+    python -m benchmarks.sentiment_bench --gpt 10   # also time 10 GPT calls
+"""
+import argparse
+import time
+
+from app.config import settings
+from app.services.ai_pipeline import analyze_sentiment
+from app.services.local_sentiment import local_sentiment
+
+SAMPLES = [
+    "Thanks so much for calling, I'd love to hear more about the offer. Please send the details.",
+    "Stop calling me. I already told you I'm not interested and this is the third time this week.",
+    "Yes, this is Sam. I got the message about the appointment. Tuesday at ten works.",
+    "Who is this? How did you get my number? I don't have time for this right now.",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transcripts", type=int, default=1024)
+    parser.add_argument("--gpt", type=int, default=0, help="Number of GPT calls to time")
+    args = parser.parse_args()
+
+    texts = [SAMPLES[i % len(SAMPLES)] for i in range(args.transcripts)]
+
+    local_sentiment.classify(texts[:1])  # load the model outside the timing
+    started = time.perf_counter()
+    local_sentiment.classify(texts)
+    elapsed = time.perf_counter() - started
+    print(f"local  {len(texts) / elapsed:10.1f} transcripts/s  ({elapsed / len(texts) * 1000:.2f} ms each)")
+
+    if args.gpt:
+        # Force the GPT path and make every transcript unique so the AI cache can't answer
+        settings.SENTIMENT_BACKEND = "gpt"
+        started = time.perf_counter()
+        for i, text in enumerate(texts[:args.gpt]):
+            analyze_sentiment(f"{text} (sample {i} {time.time()})")
+        elapsed = time.perf_counter() - started
+        print(f"gpt    {args.gpt / elapsed:10.1f} transcripts/s  ({elapsed / args.gpt * 1000:.2f} ms each)")
+
+
+if __name__ == "__main__":
+    main()
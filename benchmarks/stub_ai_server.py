@@ -0,0 +1,157 @@
+"""
+Local stand-in for OpenAI and recording downloads, for running the AI
+pipeline (and the backfill) without network access or API spend.
+
+Serves:
+    GET  /recordings/<name>.wav     generated WAV audio (tone bursts and silence)
+    POST /v1/audio/transcriptions   fixed transcript text
+    POST /v1/chat/completions       canned summary/sentiment replies with usage
+
+Run from the repo root:
+    python -m benchmarks.stub_ai_server --port 8765 --latency 0.2
+    python -m benchmarks.stub_ai_server --seed 500   # also add 500 calls pointing at it
+
+then point the pipeline at it:
+    OPENAI_BASE_URL=http://localhost:8765/v1 python -m app.backfill
+"""
+import argparse
+import io
+import json
+import math
+import struct
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_TRANSCRIPT = (
+    "Hi, this is Sam returning your call about the appointment. "
+    "Tuesday at ten works for me, please send a confirmation."
+)
+STUB_SUMMARY = "The customer confirmed the Tuesday 10am appointment and asked for a confirmation."
+
+
+def stub_wav(seconds: float, rate: int = 8000) -> bytes:
+    """
+    Alternating one-second tone bursts and half-second silences.
+    """
+    frames = bytearray()
+    for i in range(int(seconds * rate)):
+        t = i / rate
+        voiced = (t % 1.5) < 1.0
+        sample = int(6000 * math.sin(2 * math.pi * 220 * t)) if voiced else 0
+        frames += struct.pack("<h", sample)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(frames))
+    return buffer.getvalue()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    audio_seconds = 10.0
+    _audio = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_GET(self):
+        if not self.path.startswith("/recordings/"):
+            return self._send(404, b"not found", "text/plain")
+        if StubHandler._audio is None:
+            StubHandler._audio = stub_wav(self.audio_seconds)
+        self._send(200, StubHandler._audio, "audio/wav")
+
+    def do_POST(self):
+        body = self._read_body()
+        time.sleep(self.latency)
+
+        if self.path.endswith("/audio/transcriptions"):
+            return self._send(200, STUB_TRANSCRIPT.encode(), "text/plain")
+
+        if self.path.endswith("/chat/completions"):
+            request = json.loads(body or b"{}")
+            if (request.get("response_format") or {}).get("type") == "json_object":
+                content = json.dumps({"summary": STUB_SUMMARY, "sentiment": "Positive"})
+            elif "sentiment" in json.dumps(request.get("messages", [])).lower():
+                content = "Positive"
+            else:
+                content = STUB_SUMMARY
+            reply = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": len(body) // 4, "completion_tokens": len(content) // 4,
+                          "total_tokens": (len(body) + len(content)) // 4},
+            }
+            return self._send(200, json.dumps(reply).encode(), "application/json")
+
+        self._send(404, b"{}", "application/json")
+
+
+def seed_calls(count: int, base_url: str):
+    """
+    Insert `count` completed calls whose recordings are served by this stub.
+    """
+    from sqlmodel import Session
+    from app.models.call_log import CallLog, CallStatus
+    from app.models.db import engine, init_db
+
+    init_db()
+    with Session(engine) as session:
+        for i in range(count):
+            session.add(CallLog(
+                contact_name=f"Stub Contact {i}",
+                contact_number=f"+1555{i:07d}",
+                campaign_name="stub-backfill",
+                region="us",
+                provider="stub",
+                status=CallStatus.completed,
+                recording_url=f"{base_url}/recordings/{i}.wav",
+            ))
+        session.commit()
+    print(f"[🌱] Added {count} stub calls.")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each API response")
+    parser.add_argument("--audio-seconds", type=float, default=10.0, help="Length of served recordings")
+    parser.add_argument("--seed", type=int, default=0, help="Insert this many calls pointing at the stub")
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    StubHandler.audio_seconds = args.audio_seconds
+    base_url = f"http://localhost:{args.port}"
+    if args.seed:
+        seed_calls(args.seed, base_url)
+
+    server = ThreadingHTTPServer(("", args.port), StubHandler)
+    print(f"[🧪] Stub AI server on {base_url} (OPENAI_BASE_URL={base_url}/v1)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
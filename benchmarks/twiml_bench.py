@@ -0,0 +1,36 @@
+"""
+Per-request cost of building webhook TwiML.
+
+Run from the repo root: python -m benchmarks.twiml_bench
+"""
+import timeit
+from xml.etree.ElementTree import Element, tostring
+
+from app.services import twiml
+
+MESSAGE = "Hello Sam, this is a reminder about your appointment tomorrow at 10 & 11 <AM>."
+N = 100_000
+
+
+def elementtree_say(text: str) -> str:
+    response = Element("Response")
+    say = Element("Say", voice="alice")
+    say.text = text
+    response.append(say)
+    return tostring(response, encoding="unicode")
+
+
+def report(label: str, fn):
+    seconds = timeit.timeit(fn, number=N)
+    print(f"{label:<34} {seconds / N * 1e6:8.2f} µs/request")
+
+
+if __name__ == "__main__":
+    assert elementtree_say(MESSAGE).encode() == twiml.say_response(MESSAGE)
+
+    report("ElementTree (per message)", lambda: elementtree_say(MESSAGE))
+    report("twiml.say_response (per message)", lambda: twiml.say_response(MESSAGE))
+    report("ElementTree (static inbound)", lambda: elementtree_say(
+        "Thank you for calling AI Calling Agent. Please wait while we connect you."
+    ))
+    report("twiml.INBOUND_GREETING (cached)", lambda: twiml.INBOUND_GREETING)